@@ -0,0 +1,41 @@
+"""
+Build hook writing the exercise pack.
+
+Project metadata lives in pyproject.toml. This only extends ``build_py`` so
+every build packs the exercise tree into ``snakers/exercises.zip`` in the
+build directory: wheels always ship a pack matching their exercises, and
+nobody has to remember to run ``python -m snakers.pack`` before a release.
+Outside editable installs the pack is marked as a release pack, so
+``snakers init`` doesn't check the installed exercise files against it.
+"""
+
+import sys
+from pathlib import Path
+
+from setuptools import setup
+from setuptools.command.build_py import build_py
+
+ROOT = Path(__file__).resolve().parent
+
+
+class BuildPyWithPack(build_py):
+    """``build_py`` that also packs the exercises into the build."""
+
+    def run(self):
+        super().run()
+        if self.dry_run:
+            return
+        # The pack is built with snakers' own code, from this source tree
+        sys.path.insert(0, str(ROOT))
+        from snakers.pack import PACK_FILE, build_pack
+
+        target = Path(self.build_lib) / "snakers" / PACK_FILE
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # An editable install runs the checkout's exercise files, which can
+        # still change after the build
+        release = not getattr(self, "editable_mode", False)
+        count = build_pack(ROOT / "snakers" / "exercises", target, release=release)
+        self.announce(f"packed {count} exercise files into {target}", level=2)
+
+
+setup(cmdclass={"build_py": BuildPyWithPack})
@@ -9,7 +9,19 @@ __version__ = "0.1.0"
 __author__ = "Arman Rostami"
 __email__ = "arman.rostami@outlook.com"
 
-from .runner import ExerciseRunner
-from .exercise import Exercise
+# Imported on first access, so ``python -m snakers --version`` doesn't load
+# the runner and everything it depends on
+_LAZY_ATTRIBUTES = {
+    "ExerciseRunner": ".runner",
+    "Exercise": ".exercise",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = ["ExerciseRunner", "Exercise", "__version__"]
@@ -8,14 +8,11 @@ This allows the package to be executed with:
 import sys
 from pathlib import Path
 from .cli import main
-from rich.console import Console
 
 # Add the package's exercises directory to the path
 PACKAGE_DIR = Path(__file__).parent
 EXERCISES_DIR = PACKAGE_DIR / "exercises"
 
-console = Console()
-
 def run():
     """Entry point for the snakers command."""
     # Check if exercises directory exists in package
@@ -0,0 +1,228 @@
+"""
+On-disk cache of exercise verdicts keyed by everything that can change them.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from rich.console import Console
+
+console = Console()
+
+RUFF_CONFIG_FILES = ("pyproject.toml", "ruff.toml", ".ruff.toml")
+
+# Modules through which a program can see its own docstrings or line numbers,
+# which normalization would otherwise hide from the cache key
+INTROSPECTION_MODULES = {"doctest", "inspect", "linecache", "traceback"}
+
+# Characters of a failure report stored with a verdict (half from the start,
+# half from the end), so the cache file stays small however much a failing
+# run printed
+MAX_STORED_OUTPUT = 4096
+
+_ruff_version: Optional[str] = None
+
+
+def get_ruff_version() -> str:
+    """Return the installed ruff version, without spawning ruff when possible."""
+    global _ruff_version
+    if _ruff_version is None:
+        try:
+            from importlib.metadata import version
+            _ruff_version = version("ruff")
+        except Exception:
+            try:
+                result = subprocess.run(["ruff", "--version"], capture_output=True, text=True)
+                _ruff_version = result.stdout.strip() or "unknown"
+            except FileNotFoundError:
+                _ruff_version = "missing"
+    return _ruff_version
+
+
+def get_config_hash(path: Path) -> str:
+    """Hash the ruff configuration files that apply to a path."""
+    digest = hashlib.sha256()
+    for directory in path.resolve().parents:
+        for name in RUFF_CONFIG_FILES:
+            config_file = directory / name
+            if config_file.is_file():
+                digest.update(str(config_file).encode())
+                digest.update(config_file.read_bytes())
+    return digest.hexdigest()
+
+
+def normalized_source_hash(source: str) -> Optional[str]:
+    """
+    Hash of what a module does, ignoring comments, docstrings and layout.
+
+    The module's AST is dumped without positions and with docstrings
+    dropped, so two sources with the same hash compile to the same program
+    (up to docstrings and line numbers).
+
+    Returns:
+        None if the source doesn't parse, or if it may observe its own
+        docstrings or line numbers (``__doc__``, doctest, inspect, ...)
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules = [node.module or ""]
+        elif isinstance(node, ast.Name) and node.id == "__doc__":
+            return None
+        elif isinstance(node, ast.Attribute) and node.attr == "__doc__":
+            return None
+        else:
+            continue
+        if any(module.split(".")[0] in INTROSPECTION_MODULES for module in modules):
+            return None
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                    and isinstance(body[0].value.value, str):
+                del body[0]
+    return hashlib.sha256(ast.dump(tree).encode()).hexdigest()
+
+
+def _truncate_output(output: str, limit: int = MAX_STORED_OUTPUT) -> str:
+    """Keep the start and the end of a long failure report."""
+    if len(output) <= limit:
+        return output
+    head = limit // 2
+    tail = limit - head
+    dropped = len(output) - limit
+    return f"{output[:head]}\n... [{dropped} characters of output truncated] ...\n{output[-tail:]}"
+
+
+class VerdictCache:
+    """
+    LRU cache of ``Exercise.check`` verdicts stored as JSON.
+
+    Keys combine the exercise content hash with the ruff version, the Python
+    version and the ruff configuration, so a cached verdict is only reused
+    when every input to the check is byte-identical.
+
+    The file is replaced atomically, so a concurrent snakers process never
+    loads half of it, and inside ``batch()`` it is written once at the end
+    instead of after every verdict.
+    """
+
+    def __init__(self, cache_file: Path, max_entries: int = 1000):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._batch_depth = 0
+        self._dirty = False
+        self.entries: "OrderedDict[str, dict]" = self.load()
+
+    def load(self) -> "OrderedDict[str, dict]":
+        """Load cached verdicts from file."""
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file) as f:
+                    return OrderedDict(json.load(f).get("entries", {}))
+            except (json.JSONDecodeError, IOError, AttributeError):
+                console.print("[yellow]Warning: Could not load verdict cache[/yellow]")
+        return OrderedDict()
+
+    def save(self):
+        """Save cached verdicts to file."""
+        temp_path = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with self._lock:
+                self._dirty = False
+                with open(temp_path, "w") as f:
+                    json.dump({"entries": self.entries}, f)
+            os.replace(temp_path, self.cache_file)
+        except IOError as e:
+            console.print(f"[yellow]Warning: Could not save verdict cache: {e}[/yellow]")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Defer saving the verdicts stored inside the block (from any thread) to its end."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                pending = self._batch_depth == 0 and self._dirty
+            if pending:
+                self.save()
+
+    def make_key(self, path: Path, content: bytes, *extra: str) -> str:
+        """Build the cache key for an exercise's current inputs."""
+        digest = hashlib.sha256()
+        for part in (
+            hashlib.sha256(content).hexdigest(),
+            get_ruff_version(),
+            sys.version,
+            platform.python_implementation(),
+            get_config_hash(path),
+            *extra,
+        ):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def make_runtime_key(self, normalized_hash: str, *extra: str) -> str:
+        """
+        Build the cache key for the runtime phase of a check.
+
+        Keyed by ``normalized_source_hash`` instead of the file's bytes and
+        leaving ruff out, so the verdict survives edits to comments,
+        docstrings and formatting (which ruff still has to re-check).
+        """
+        digest = hashlib.sha256()
+        for part in ("runtime", normalized_hash, sys.version, platform.python_implementation(), *extra):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached verdict for a key, marking it recently used."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, passed: bool, output: str = "") -> None:
+        """Store a verdict, evicting the least recently used entries over the cap."""
+        with self._lock:
+            self.entries[key] = {"passed": passed, "output": _truncate_output(output)}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self._dirty = True
+            if self._batch_depth:
+                return
+        self.save()
+
+    def clear(self) -> None:
+        """Drop every cached verdict."""
+        with self._lock:
+            self.entries.clear()
+        self.save()
@@ -7,17 +7,25 @@ import sys
 from pathlib import Path
 from typing import Optional
 
-from rich.console import Console
-from rich.panel import Panel
-from rich.text import Text
+from .execution import DEFAULT_OUTPUT_LIMIT
 
-from .runner import ExerciseRunner
-from .init import initialize_snakers
+# rich and the runner take most of the startup time, so they are imported by
+# the commands that need them; ``--version`` and argument errors skip them
+_console = None
 
-console = Console()
+def get_console():
+    """The shared rich console, created on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
 
 def print_welcome():
     """Print welcome message and instructions."""
+    from rich.panel import Panel
+    from rich.text import Text
+    
     welcome_text = Text()
     welcome_text.append("🐍 Welcome to ", style="bold blue")
     welcome_text.append("Snakers", style="bold green")
@@ -28,12 +36,14 @@ def print_welcome():
     welcome_text.append("  run [exercise]  - Run next exercise or specific exercise\n")
     welcome_text.append("  watch          - Watch for file changes and auto-check\n")
     welcome_text.append("  list           - List all exercises with progress\n")
-    welcome_text.append("  reset          - Reset progress\n")
+    welcome_text.append("  check-all      - Verify every exercise in parallel\n")
+    welcome_text.append("  report [dir]   - Show progress across all learners\n")
+    welcome_text.append("  reset          - Reset progress and cached verdicts\n")
     welcome_text.append("  init            - Initialize or reset exercises directory\n")
     welcome_text.append("  solutions       - Manage solutions (list, show, reset)\n")
     welcome_text.append("  help [topic]    - Show help on a specific topic\n")
     
-    console.print(Panel(welcome_text, title="Snakers", border_style="green"))
+    get_console().print(Panel(welcome_text, title="Snakers", border_style="green"))
 
 def print_help(topic: Optional[str] = None):
     """Print help information on a specific topic."""
@@ -46,9 +56,10 @@ def print_help(topic: Optional[str] = None):
         "init": (
             "Initialize Snakers",
             "Creates the necessary directory structure and exercise files.\n\n"
-            "Usage: snakers init [--target DIR]\n\n"
+            "Usage: snakers init [--target DIR] [--update]\n\n"
             "Options:\n"
-            "  --target DIR  Directory to initialize (default: current directory)\n\n"
+            "  --target DIR  Directory to initialize (default: current directory)\n"
+            "  --update      Add new exercises and refresh unmodified ones, keeping your edits\n\n"
             "This will create:\n"
             "- An exercises directory with all exercise files\n"
             "- A solutions directory to store completed exercises\n"
@@ -57,7 +68,9 @@ def print_help(topic: Optional[str] = None):
         # ...existing help topics...
     }
     
+    console = get_console()
     if topic in topics:
+        from rich.panel import Panel
         title, content = topics[topic]
         console.print(Panel(content, title=title, border_style="blue"))
     else:
@@ -79,6 +92,10 @@ def main(exercises_dir: Optional[Path] = None):
     # Init command
     init_parser = subparsers.add_parser("init", help="Initialize exercises")
     init_parser.add_argument("--target", type=Path, help="Target directory for initialization")
+    init_parser.add_argument(
+        "--update", action="store_true",
+        help="Only add new exercises and refresh the ones you haven't modified"
+    )
     
     # Run command
     run_parser = subparsers.add_parser("run", help="Run an exercise")
@@ -87,12 +104,36 @@ def main(exercises_dir: Optional[Path] = None):
     # Watch command
     watch_parser = subparsers.add_parser("watch", help="Watch for file changes")
     watch_parser.add_argument("exercise", nargs="?", help="Specific exercise name")
+    watch_parser.add_argument(
+        "--poll", action="store_true", default=None,
+        help="Poll for changes instead of using file change events "
+             "(automatic on NFS, SMB and Docker Desktop bind mounts)"
+    )
     
     # List command
-    subparsers.add_parser("list", help="List all exercises with progress")
+    list_parser = subparsers.add_parser("list", help="List all exercises with progress")
+    list_parser.add_argument("--verify", action="store_true", help="Re-check exercises instead of trusting saved progress")
+    
+    # Check-all command
+    check_all_parser = subparsers.add_parser("check-all", help="Verify every exercise in parallel")
+    check_all_parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="Number of exercises to check at once (default: CPU count)"
+    )
+    check_all_parser.add_argument(
+        "--async", dest="use_async", action="store_true",
+        help="Run checks from a single asyncio event loop instead of a thread pool"
+    )
+    
+    # Report command
+    report_parser = subparsers.add_parser("report", help="Show progress across all learners")
+    report_parser.add_argument(
+        "exercise", nargs="?",
+        help="Exercise directory or file to list stuck learners for (e.g. 12_concurrency)"
+    )
     
     # Reset command
-    subparsers.add_parser("reset", help="Reset progress")
+    subparsers.add_parser("reset", help="Reset progress and cached verdicts")
     
     # Solutions subcommand
     solutions_parser = subparsers.add_parser("solutions", help="Manage solutions")
@@ -104,6 +145,10 @@ def main(exercises_dir: Optional[Path] = None):
     # Solutions show command
     show_parser = solutions_subparsers.add_parser("show", help="Show a specific solution")
     show_parser.add_argument("exercise", help="Exercise name to show solution for")
+    show_parser.add_argument(
+        "--version", type=int, default=None,
+        help="Solution version to show (default: the latest)"
+    )
     
     # Solutions reset command
     solutions_subparsers.add_parser("reset", help="Reset all solutions")
@@ -112,6 +157,41 @@ def main(exercises_dir: Optional[Path] = None):
     help_parser = subparsers.add_parser("help", help="Show help message")
     help_parser.add_argument("topic", nargs="?", help="Help topic")
     
+    # Execution backend
+    parser.add_argument(
+        "--backend",
+        choices=["subprocess", "forkserver"],
+        default="subprocess",
+        help="How exercises are executed: a fresh interpreter per run, "
+             "or forks of a pre-warmed interpreter"
+    )
+    
+    # Output capture cap
+    parser.add_argument(
+        "--max-output",
+        type=int,
+        default=DEFAULT_OUTPUT_LIMIT,
+        metavar="BYTES",
+        help="Bytes of each exercise output stream to keep; the middle of "
+             "longer output is dropped (default: %(default)s)"
+    )
+    
+    # Progress database
+    parser.add_argument(
+        "--learner",
+        default=None,
+        help="Learner id progress is recorded under "
+             "(default: $SNAKERS_LEARNER or the login name)"
+    )
+    parser.add_argument(
+        "--progress-db",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Progress database, which can be shared by a cohort "
+             "(default: $SNAKERS_PROGRESS_DB or ~/.snakers_progress.db)"
+    )
+    
     # Version flag
     parser.add_argument(
         "--version",
@@ -131,40 +211,53 @@ def main(exercises_dir: Optional[Path] = None):
         return
     
     if args.command == "init":
+        from .init import initialize_snakers
         target_dir = args.target or Path.cwd()
-        initialize_snakers(target_dir)
+        initialize_snakers(target_dir, update=args.update)
         return
     
-    # Initialize runner with exercises directory
+    # Initialize runner with exercises directory (imported here so the
+    # commands above start without loading it)
+    from .runner import ExerciseRunner
     if exercises_dir and exercises_dir.exists():
-        runner = ExerciseRunner(exercises_dir)
+        runner = ExerciseRunner(
+            exercises_dir,
+            backend=args.backend,
+            output_limit=args.max_output,
+            learner=args.learner,
+            progress_db=args.progress_db,
+        )
     else:
-        console.print("[red]Error: Exercises directory not found.[/red]")
-        console.print(f"Looking for: {exercises_dir}")
-        console.print("[yellow]Try running 'snakers init' to create the exercises directory.[/yellow]")
+        get_console().print("[red]Error: Exercises directory not found.[/red]")
+        get_console().print(f"Looking for: {exercises_dir}")
+        get_console().print("[yellow]Try running 'snakers init' to create the exercises directory.[/yellow]")
         sys.exit(1)
     
     try:
         if args.command == "run":
             runner.run_exercise(args.exercise)
         elif args.command == "watch":
-            runner.watch_mode(args.exercise)
+            runner.watch_mode(args.exercise, poll=args.poll)
+        elif args.command == "check-all":
+            runner.check_all_exercises(workers=args.jobs, use_async=args.use_async)
         elif args.command == "list":
-            runner.list_exercises()
+            runner.list_exercises(verify=args.verify)
+        elif args.command == "report":
+            runner.cohort_report(args.exercise)
         elif args.command == "reset":
             runner.reset_progress()
         elif args.command == "solutions":
             if args.solutions_command == "list":
                 runner.list_solutions()
             elif args.solutions_command == "show":
-                runner.show_solution(args.exercise)
+                runner.show_solution(args.exercise, version=args.version)
             elif args.solutions_command == "reset":
                 runner.reset_solutions()
             else:
-                console.print("[yellow]Please specify a solutions command (list, show, reset)[/yellow]")
+                get_console().print("[yellow]Please specify a solutions command (list, show, reset)[/yellow]")
     except KeyboardInterrupt:
-        console.print("\n[yellow]Interrupted by user[/yellow]")
+        get_console().print("\n[yellow]Interrupted by user[/yellow]")
         sys.exit(0)
     except Exception as e:
-        console.print(f"[red]Error: {e}[/red]")
+        get_console().print(f"[red]Error: {e}[/red]")
         sys.exit(1)
@@ -0,0 +1,652 @@
+"""
+Execution backends for running exercise files.
+
+The default backend starts a fresh interpreter per run. The forkserver
+backend keeps a pre-warmed interpreter with the commonly used stdlib modules
+already imported and forks it once per run instead.
+"""
+
+import codecs
+import json
+import os
+import select
+import selectors
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+from .limits import ResourceLimits
+
+# Stdlib modules imported once by the forkserver so runs don't pay for them
+# (runpy and traceback are what _run_as_main itself needs)
+PRELOAD_MODULES = ["typing", "threading", "asyncio", "json", "csv", "runpy", "traceback"]
+
+# Bytes of each output stream kept per run (half from the start, half from the end)
+DEFAULT_OUTPUT_LIMIT = 256 * 1024
+
+# Seconds between checks for a child's exit where it can't be waited on
+# alongside its pipes
+EXIT_POLL_INTERVAL = 0.05
+
+
+
+class RunUsage:
+    """Wall time, CPU time and peak memory of one exercise run."""
+
+    def __init__(
+        self,
+        wall: float,
+        user: Optional[float] = None,
+        system: Optional[float] = None,
+        max_rss_kb: Optional[int] = None,
+    ):
+        self.wall = wall
+        self.user = user
+        self.system = system
+        self.max_rss_kb = max_rss_kb
+
+    @classmethod
+    def from_rusage(cls, wall: float, usage) -> "RunUsage":
+        """Build from a ``resource.struct_rusage`` (as returned by ``os.wait4``)."""
+        max_rss = usage.ru_maxrss
+        if sys.platform == "darwin":
+            # macOS reports bytes, everyone else kilobytes
+            max_rss //= 1024
+        return cls(wall, usage.ru_utime, usage.ru_stime, max_rss)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RunUsage":
+        """Load from the form stored in the progress file."""
+        return cls(data["wall"], data.get("user"), data.get("system"), data.get("max_rss_kb"))
+
+    def to_dict(self) -> Dict:
+        """Convert to a JSON-serialisable dict."""
+        return {
+            "wall": round(self.wall, 4),
+            "user": None if self.user is None else round(self.user, 4),
+            "system": None if self.system is None else round(self.system, 4),
+            "max_rss_kb": self.max_rss_kb,
+        }
+
+    @property
+    def cpu(self) -> Optional[float]:
+        """Total user plus system CPU seconds."""
+        if self.user is None or self.system is None:
+            return None
+        return self.user + self.system
+
+    def describe(self) -> str:
+        """One-line human readable summary."""
+        parts = [f"wall {self.wall:.2f}s"]
+        if self.cpu is not None:
+            parts.append(f"cpu {self.user:.2f}s user / {self.system:.2f}s sys")
+        if self.max_rss_kb is not None:
+            parts.append(f"peak RSS {self.max_rss_kb / 1024:.1f} MB")
+        return " · ".join(parts)
+
+
+# (exit code, or None if the run timed out; combined stdout and stderr;
+# number of stray processes killed after the run; resource usage)
+RunResult = Tuple[Optional[int], str, int, RunUsage]
+
+
+class OutputBuffer:
+    """
+    Bounded capture of a child's output stream.
+
+    Keeps the first and last ``limit / 2`` bytes and counts what was dropped
+    in between, so a runaway ``print`` loop costs a fixed amount of memory
+    while the start of the output and the final traceback survive.
+    """
+
+    def __init__(self, limit: int = DEFAULT_OUTPUT_LIMIT, echo: Optional[Callable[[str], None]] = None):
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.dropped = 0
+        self.echo = echo
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def write(self, data: bytes) -> None:
+        """Add a chunk of output, echoing it live if requested."""
+        if self.echo is not None:
+            self.echo(self._decoder.decode(data))
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            excess = len(self.tail) - self.tail_limit
+            if excess > 0:
+                del self.tail[:excess]
+                self.dropped += excess
+
+    def getvalue(self) -> bytes:
+        """Captured output, with a marker where bytes were dropped."""
+        if not self.dropped:
+            return bytes(self.head + self.tail)
+        marker = f"\n... [{self.dropped} bytes of output truncated] ...\n".encode()
+        return bytes(self.head) + marker + bytes(self.tail)
+
+    def text(self) -> str:
+        """Captured output decoded as UTF-8."""
+        return self.getvalue().decode(errors="replace")
+
+
+def communicate_with_usage(
+    process: subprocess.Popen,
+    timeout: Optional[float],
+    started: float,
+    stdout: OutputBuffer,
+    stderr: OutputBuffer,
+    input: Optional[bytes] = None,
+    on_exit: Optional[Callable[[], None]] = None,
+) -> RunUsage:
+    """
+    Like ``Popen.communicate``, but bounded and reaping with ``os.wait4``.
+
+    Output is streamed into the given buffers as it arrives. The rusage
+    returned by ``wait4`` covers the child and every descendant it waited
+    for, which ``Popen.wait`` throws away. Returns once the child exits,
+    even if something it started still holds its pipes; ``on_exit`` runs
+    before what is left in them is read, so it can kill such processes.
+
+    Args:
+        process: Child started with stdout and stderr pipes
+        timeout: Seconds to wait for the child (None: no limit)
+        started: ``time.perf_counter()`` value taken when the child started
+        stdout: Buffer receiving the child's stdout
+        stderr: Buffer receiving the child's stderr
+        input: Bytes to write to the child's stdin pipe, which is then closed
+        on_exit: Called once the child has exited and been reaped
+
+    Raises:
+        subprocess.TimeoutExpired: If the child is still running at the deadline
+    """
+    if not hasattr(os, "wait4"):
+        # Windows: no select() on pipes and no rusage for children
+        out, err = process.communicate(input, timeout=timeout)
+        stdout.write(out)
+        stderr.write(err)
+        if on_exit is not None:
+            on_exit()
+        return RunUsage(time.perf_counter() - started)
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    buffers = {process.stdout.fileno(): stdout, process.stderr.fileno(): stderr}
+    pipes = [process.stdout, process.stderr]
+    written = 0
+    reaped = None
+    # Anything the child started can hold its pipes open after it exits, so
+    # watch for the exit itself: through a pidfd where there is one, and by
+    # polling wait4 otherwise
+    pidfd = _open_pidfd(process.pid)
+    try:
+        with selectors.DefaultSelector() as selector:
+            for pipe in pipes:
+                selector.register(pipe, selectors.EVENT_READ)
+            if input is not None and process.stdin is not None:
+                selector.register(process.stdin, selectors.EVENT_WRITE)
+            if pidfd is not None:
+                selector.register(pidfd, selectors.EVENT_READ)
+            while any(not pipe.closed for pipe in pipes):
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise subprocess.TimeoutExpired(process.args, timeout)
+                wait = remaining
+                if pidfd is None:
+                    wait = EXIT_POLL_INTERVAL if remaining is None else min(remaining, EXIT_POLL_INTERVAL)
+                ready = selector.select(wait)
+                if pidfd is None or any(key.fd == pidfd for key, _ in ready):
+                    pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+                    if pid:
+                        reaped = status, usage
+                        break
+                for key, _ in ready:
+                    if key.fd == pidfd:
+                        continue
+                    if key.fileobj is process.stdin:
+                        # At most PIPE_BUF bytes, which a writable pipe takes
+                        # without blocking
+                        try:
+                            written += os.write(key.fd, input[written:written + select.PIPE_BUF])
+                        except BrokenPipeError:
+                            written = len(input)
+                        if written >= len(input):
+                            selector.unregister(key.fileobj)
+                            key.fileobj.close()
+                        continue
+                    data = os.read(key.fd, 32768)
+                    if data:
+                        buffers[key.fd].write(data)
+                    else:
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+
+    if reaped is not None:
+        status, usage = reaped
+        if on_exit is not None:
+            on_exit()
+        drain_available({pipe.fileno(): buffers[pipe.fileno()] for pipe in pipes if not pipe.closed})
+        for pipe in (process.stdin, *pipes):
+            if pipe is not None:
+                pipe.close()
+    else:
+        # Both pipes are closed; the child has exited or is about to
+        while True:
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+            if pid:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(process.args, timeout)
+            time.sleep(0.001)
+        if on_exit is not None:
+            on_exit()
+
+    process.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+    return RunUsage.from_rusage(time.perf_counter() - started, usage)
+
+
+# Run by ``python -c <bootstrap> <fd> <path> [RLIMIT_<name>=<soft>:<hard>...]``:
+# sets the given resource limits (like ResourceLimits.apply, but after exec
+# rather than in a preexec_fn, which isn't safe with threads around), reads a
+# snapshot's source from the inherited pipe ``fd`` and runs it as
+# ``__main__`` the way ``python <path>`` would run the file
+SOURCE_BOOTSTRAP = """\
+import linecache, os, sys, types
+fd, path = int(sys.argv[1]), sys.argv[2]
+for limit in sys.argv[3:]:
+    import resource
+    name, _, values = limit.partition("=")
+    kind = getattr(resource, name)
+    soft, hard = map(int, values.split(":"))
+    current = resource.getrlimit(kind)[1]
+    if current != resource.RLIM_INFINITY:
+        soft, hard = min(soft, current), min(hard, current)
+    resource.setrlimit(kind, (soft, hard))
+with os.fdopen(fd, "rb") as pipe:
+    source = pipe.read()
+sys.argv = [path]
+sys.path[0] = os.path.dirname(os.path.abspath(path))
+linecache.cache[path] = (len(source), None, source.decode("utf-8", "replace").splitlines(True), path)
+module = types.ModuleType("__main__")
+module.__file__ = path
+sys.modules["__main__"] = module
+try:
+    exec(compile(source, path, "exec", dont_inherit=True), module.__dict__)
+except SystemExit:
+    raise
+except BaseException:
+    import traceback
+    exc_type, exc_value, tb = sys.exc_info()
+    while tb is not None and tb.tb_frame.f_code.co_filename != path:
+        tb = tb.tb_next
+    traceback.print_exception(exc_type, exc_value, tb)
+    sys.exit(1)
+"""
+
+
+class SourcePipe:
+    """
+    Hands an exercise's source to a fresh interpreter through a pipe.
+
+    The interpreter runs ``SOURCE_BOOTSTRAP``, so what runs is the snapshot
+    that was graded rather than whatever is on disk once the interpreter
+    gets around to opening the file, and under the given limits. Where file
+    descriptors can't be inherited (Windows) the file is run from disk,
+    without limits.
+    """
+
+    def __init__(self, path: Path, source: bytes, limits: Optional[ResourceLimits] = None):
+        self.path = path
+        self.source = source
+        self.limits = limits
+        self._read_fd: Optional[int] = None
+        self._write_fd: Optional[int] = None
+        if sys.platform != "win32":
+            self._read_fd, self._write_fd = os.pipe()
+
+    @property
+    def command(self) -> List[str]:
+        """Interpreter command line running the source."""
+        if self._read_fd is None:
+            return [sys.executable, str(self.path)]
+        rlimits = self.limits.rlimits() if self.limits else []
+        return [
+            sys.executable, "-c", SOURCE_BOOTSTRAP, str(self._read_fd), str(self.path),
+            *(f"{name}={soft}:{hard}" for name, soft, hard in rlimits),
+        ]
+
+    @property
+    def pass_fds(self) -> Tuple[int, ...]:
+        """File descriptors the interpreter has to inherit."""
+        return () if self._read_fd is None else (self._read_fd,)
+
+    def feed(self) -> None:
+        """Send the source to the started interpreter and close the pipe."""
+        self._close_read_end()
+        if self._write_fd is None:
+            return
+        fd, self._write_fd = self._write_fd, None
+        try:
+            # Exercises fit in the pipe buffer, so this doesn't wait for the child
+            with os.fdopen(fd, "wb") as pipe:
+                pipe.write(self.source)
+        except BrokenPipeError:
+            # The child died before reading; its exit status says why
+            pass
+
+    def close(self) -> None:
+        """Close both ends (when the interpreter could not be started)."""
+        self._close_read_end()
+        if self._write_fd is not None:
+            os.close(self._write_fd)
+            self._write_fd = None
+
+    def _close_read_end(self) -> None:
+        if self._read_fd is not None:
+            os.close(self._read_fd)
+            self._read_fd = None
+
+
+def list_process_group(pgid: int) -> List[int]:
+    """Return the pids of the live (non-zombie) processes in a process group."""
+    members = []
+    if os.path.isdir("/proc"):
+        for entry in os.scandir("/proc"):
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(os.path.join(entry.path, "stat")) as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            # Fields after the command name: state, ppid, pgrp, ...
+            fields = stat.rsplit(")", 1)[-1].split()
+            if len(fields) > 2 and fields[0] != "Z" and int(fields[2]) == pgid:
+                members.append(int(entry.name))
+        return members
+
+    try:
+        result = subprocess.run(
+            ["ps", "-A", "-o", "pid=,pgid=,stat="], capture_output=True, text=True
+        )
+    except OSError:
+        return members
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and int(parts[1]) == pgid and not parts[2].startswith("Z"):
+            members.append(int(parts[0]))
+    return members
+
+
+def kill_process_group(pgid: int, leader: Optional[int] = None) -> int:
+    """
+    SIGKILL every process in a process group.
+
+    Args:
+        pgid: Process group to kill
+        leader: Pid of the process we started, not counted as a stray
+
+    Returns:
+        How many processes other than the leader were killed
+    """
+    if not hasattr(os, "killpg"):
+        return 0
+    strays = [pid for pid in list_process_group(pgid) if pid != leader]
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    return len(strays)
+
+
+def _open_pidfd(pid: int) -> Optional[int]:
+    """A file descriptor that becomes readable when ``pid`` exits, if the OS has them."""
+    if not hasattr(os, "pidfd_open"):
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except OSError:
+        # Kernel older than 5.3
+        return None
+
+
+def drain_until_exit(
+    sentinel: int, buffers: Dict[int, OutputBuffer], timeout: Optional[float]
+) -> bool:
+    """
+    Stream output pipes into buffers until a child exits.
+
+    Args:
+        sentinel: File descriptor that becomes ready when the child exits
+        buffers: Buffer receiving the output of each pipe's read end
+        timeout: Seconds to wait for the child (None: no limit)
+
+    Returns:
+        Whether the child exited before the timeout
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with selectors.DefaultSelector() as selector:
+        selector.register(sentinel, selectors.EVENT_READ)
+        for fd in buffers:
+            selector.register(fd, selectors.EVENT_READ)
+        while True:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+            for key, _ in selector.select(remaining):
+                if key.fd == sentinel:
+                    return True
+                data = os.read(key.fd, 32768)
+                if data:
+                    buffers[key.fd].write(data)
+                else:
+                    selector.unregister(key.fd)
+
+
+def drain_available(buffers: Dict[int, OutputBuffer]) -> None:
+    """Read what is left in output pipes without waiting for more."""
+    for fd, buffer in buffers.items():
+        os.set_blocking(fd, False)
+        while True:
+            try:
+                data = os.read(fd, 32768)
+            except BlockingIOError:
+                # A writer that escaped the process group still holds the pipe
+                break
+            if not data:
+                break
+            buffer.write(data)
+
+
+def _write_usage(usage_path: str) -> None:
+    """Record this process's (and its reaped children's) rusage for the parent."""
+    if resource is None:
+        return
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    max_rss = max(own.ru_maxrss, children.ru_maxrss)
+    if sys.platform == "darwin":
+        max_rss //= 1024
+    with open(usage_path, "w") as f:
+        json.dump({
+            "user": own.ru_utime + children.ru_utime,
+            "system": own.ru_stime + children.ru_stime,
+            "max_rss_kb": max_rss,
+        }, f)
+
+
+def _run_as_main(
+    path: str,
+    stdout,
+    stderr,
+    limits: Optional[ResourceLimits] = None,
+    usage_path: Optional[str] = None,
+    source: Optional[bytes] = None,
+) -> None:
+    """
+    Run an exercise file as ``__main__`` the way ``python <file>`` would.
+
+    ``stdout`` and ``stderr`` are the write ends of the parent's output
+    pipes (``multiprocessing`` connections). When ``source`` is given it is
+    run instead of the file's current content.
+    """
+    import runpy
+    import traceback
+
+    # Own process group, so the whole tree can be killed after the run
+    os.setsid()
+    if limits:
+        limits.apply()
+    for fd, pipe in ((1, stdout), (2, stderr)):
+        os.dup2(pipe.fileno(), fd)
+        pipe.close()
+
+    sys.argv = [path]
+    sys.path[0:0] = [os.path.dirname(os.path.abspath(path))]
+    try:
+        if source is not None:
+            _exec_as_main(path, source)
+        else:
+            runpy.run_path(path, run_name="__main__")
+    except SystemExit:
+        raise
+    except BaseException:
+        # Drop the runpy frames so the traceback starts at the exercise
+        exc_type, exc_value, tb = sys.exc_info()
+        while tb is not None and tb.tb_frame.f_code.co_filename != path:
+            tb = tb.tb_next
+        traceback.print_exception(exc_type, exc_value, tb or exc_value.__traceback__)
+        raise SystemExit(1) from None
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        if usage_path:
+            _write_usage(usage_path)
+
+
+def _exec_as_main(path: str, source: bytes) -> None:
+    """Execute source as the ``__main__`` module of the file at ``path``."""
+    import linecache
+    import types
+
+    # Tracebacks quote the lines that ran, not the file as it is by then
+    linecache.cache[path] = (len(source), None, source.decode("utf-8", errors="replace").splitlines(True), path)
+    module = types.ModuleType("__main__")
+    module.__file__ = path
+    sys.modules["__main__"] = module
+    exec(compile(source, path, "exec", dont_inherit=True), module.__dict__)
+
+
+class ForkServerBackend:
+    """Run exercises in processes forked from a pre-warmed interpreter."""
+
+    name = "forkserver"
+
+    def __init__(self):
+        import multiprocessing
+        self._context = multiprocessing.get_context("forkserver")
+        self._context.set_forkserver_preload(PRELOAD_MODULES + [__name__])
+
+    @staticmethod
+    def is_available() -> bool:
+        """Whether the platform supports the forkserver start method."""
+        import multiprocessing
+        return "forkserver" in multiprocessing.get_all_start_methods()
+
+    def start(self) -> None:
+        """Start the forkserver now so the first run doesn't pay for warm-up."""
+        from multiprocessing import forkserver
+        forkserver.ensure_running()
+
+    def run(
+        self,
+        path: Path,
+        timeout: float,
+        limits: Optional[ResourceLimits] = None,
+        output_limit: int = DEFAULT_OUTPUT_LIMIT,
+        source: Optional[bytes] = None,
+        on_start: Optional[Callable[[Any], None]] = None,
+    ) -> RunResult:
+        """
+        Run an exercise file and wait for it to finish.
+
+        Args:
+            path: Exercise file to run
+            timeout: Seconds to wait before killing the run
+            limits: Resource limits to apply in the forked child
+            output_limit: Bytes of each output stream to keep
+            source: Content to run instead of reading the file
+            on_start: Called with the ``multiprocessing`` process once it is
+                started, so another thread can kill the run (the process
+                leads its own session once it is up)
+
+        Returns:
+            The exit code (None on timeout), the combined output, the number
+            of stray processes killed afterwards and the run's resource usage
+        """
+        import tempfile
+
+        fd, usage_path = tempfile.mkstemp(prefix="snakers-", suffix=".usage")
+        os.close(fd)
+        # Output comes back through pipes drained while the run goes on, so
+        # only the bounded buffers' worth of it is ever held anywhere
+        stdout_reader, stdout_writer = self._context.Pipe(duplex=False)
+        stderr_reader, stderr_writer = self._context.Pipe(duplex=False)
+        stdout, stderr = OutputBuffer(output_limit), OutputBuffer(output_limit)
+        buffers = {stdout_reader.fileno(): stdout, stderr_reader.fileno(): stderr}
+        try:
+            process = self._context.Process(
+                target=_run_as_main,
+                args=(str(path), stdout_writer, stderr_writer, limits, usage_path, source),
+            )
+            started = time.perf_counter()
+            try:
+                process.start()
+            finally:
+                # The child has its own copies; ours would keep the pipes open
+                stdout_writer.close()
+                stderr_writer.close()
+            try:
+                if on_start is not None:
+                    on_start(process)
+                timed_out = not drain_until_exit(process.sentinel, buffers, timeout)
+            finally:
+                # Kill whatever the run left behind (or everything, on timeout
+                # or interrupt) before reaping the child
+                strays = kill_process_group(process.pid, leader=process.pid)
+                if process.is_alive():
+                    process.kill()
+                process.join()
+            drain_available(buffers)
+            returncode = None if timed_out else process.exitcode
+            usage = RunUsage(time.perf_counter() - started)
+            try:
+                reported = json.loads(Path(usage_path).read_text() or "{}")
+                usage = RunUsage.from_dict(dict(reported, wall=usage.wall))
+            except (OSError, ValueError):
+                pass
+
+            return returncode, stdout.text() + stderr.text(), strays, usage
+        finally:
+            stdout_reader.close()
+            stderr_reader.close()
+            os.unlink(usage_path)
@@ -2,82 +2,706 @@
 Exercise class for handling individual exercises.
 """
 
+import hashlib
+import os
+import signal
 import subprocess
-import sys
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, List, NamedTuple, Optional, Tuple
 
 from rich.console import Console
 
+from .cache import VerdictCache, normalized_source_hash
+from .execution import (
+    DEFAULT_OUTPUT_LIMIT,
+    EXIT_POLL_INTERVAL,
+    ForkServerBackend,
+    OutputBuffer,
+    RunUsage,
+    SourcePipe,
+    communicate_with_usage,
+    kill_process_group,
+)
+from .limits import ResourceLimits
+from .linting import LintResult
+
+if TYPE_CHECKING:
+    import asyncio
+
 console = Console()
 
+# Seconds an exercise may run before it is considered hung
+RUN_TIMEOUT = 10
+
+
+def _signal_note(returncode: Optional[int]) -> str:
+    """Explain a run that was ended by a signal (negative return code)."""
+    if returncode is None or returncode >= 0:
+        return ""
+    if hasattr(signal, "SIGXCPU") and -returncode == signal.SIGXCPU:
+        return "\nKilled: CPU time limit exceeded"
+    try:
+        return f"\nKilled by {signal.Signals(-returncode).name}"
+    except ValueError:
+        return f"\nKilled by signal {-returncode}"
+
+
+class Snapshot(NamedTuple):
+    """
+    An exercise file's bytes, read once for a check.
+
+    The TODO scan, ruff, the interpreter and the display all use the same
+    snapshot, so a save in the middle of a check can't get one version
+    linted and another one run.
+    """
+
+    path: Path
+    content: bytes
+    content_hash: str
+
+    @classmethod
+    def take(cls, path: Path) -> "Snapshot":
+        """Read a file."""
+        content = path.read_bytes()
+        return cls(path, content, hashlib.sha256(content).hexdigest())
+
+    @property
+    def text(self) -> str:
+        """The content as text."""
+        return self.content.decode("utf-8", errors="replace")
+
+
+class CheckKeys(NamedTuple):
+    """Verdict cache keys of one check."""
+
+    # Key of the exact inputs (None: no cache)
+    cache_key: Optional[str]
+    # Key of the runtime verdict (None: the source can't be normalized)
+    runtime_key: Optional[str]
+    # Whether the same program already ran successfully
+    reuse_run: bool
+
+
 class Exercise:
     """Represents a single exercise."""
 
     def __init__(self, path: Path):
         self.path = path
+        # Where check results are reported; batch runs swap in a buffer
+        self.console = console
+        # Pre-warmed interpreter to run the file in (None: fresh interpreter)
+        self.backend: Optional[ForkServerBackend] = None
         self.name = path.stem
         self.relative_path = str(path.relative_to(path.parent.parent))
+        self.failure = ""
+        self._cacheable = True
+        # Limits declared in the exercise's docstring, parsed on each check
+        self.limits = ResourceLimits()
+        # Resource usage of the last run (None if the file wasn't run)
+        self.usage: Optional[RunUsage] = None
+        # Bytes of each output stream kept per run, and whether to show the
+        # run's output as it happens (watch mode)
+        self.output_limit = DEFAULT_OUTPUT_LIMIT
+        self.live_output = False
+        # Child the running check is waiting on, a Popen or a backend's
+        # multiprocessing process (and whether it leads its own process
+        # group), so another thread can cancel the check
+        self._child: Optional[Tuple[Any, bool]] = None
+        # Set by cancel(); never cleared, so a cancel that arrives before the
+        # check starts (while the snapshot is taken) still counts
+        self.cancelled = False
+        # Hash of the local modules the exercise imports, part of its cache key
+        self.dependency_hash = ""
+        # Content graded by the last check
+        self.snapshot: Optional[Snapshot] = None
 
     def get_content(self) -> str:
         """Get the exercise file content."""
         return self.path.read_text()
 
-    def check(self) -> bool:
-        """Check if the exercise passes all validation."""
+    def take_snapshot(self) -> Snapshot:
+        """Read the exercise file for a check."""
+        return Snapshot.take(self.path)
+
+    def check(
+        self,
+        ruff_result: Optional[LintResult] = None,
+        cache: Optional[VerdictCache] = None,
+        snapshot: Optional[Snapshot] = None,
+    ) -> bool:
+        """
+        Check if the exercise passes all validation.
+
+        Args:
+            ruff_result: Pre-computed ``(passed, output)`` ruff verdict, e.g. from
+                a batch run over the whole tree. Ruff is invoked for this file
+                only when it is not given.
+            cache: Verdict cache to consult before (and update after) checking
+            snapshot: Content to grade (default: the file is read now); a
+                given ``ruff_result`` must be for this content
+
+        Returns:
+            Whether the exercise passed; False if the check was cancelled
+        """
+        snapshot = snapshot or self.take_snapshot()
+        verdict, keys = self._begin_check(snapshot, cache)
+        if verdict is not None:
+            return verdict
+        passed = self._check_content(snapshot, ruff_result, run=not keys.reuse_run)
+        return self._finish_check(passed, cache, keys)
+
+    async def check_async(
+        self,
+        ruff_result: Optional[LintResult] = None,
+        cache: Optional[VerdictCache] = None,
+        snapshot: Optional[Snapshot] = None,
+    ) -> bool:
+        """
+        Check the exercise without blocking the event loop.
+
+        Ruff and the interpreter run concurrently; as soon as either fails the
+        other is cancelled and its child process killed.
+
+        Args:
+            ruff_result: Pre-computed ``(passed, output)`` ruff verdict
+            cache: Verdict cache to consult before (and update after) checking
+            snapshot: Content to grade (default: the file is read now)
+        """
+        snapshot = snapshot or self.take_snapshot()
+        verdict, keys = self._begin_check(snapshot, cache)
+        if verdict is not None:
+            return verdict
+        passed = await self._check_content_async(snapshot, ruff_result, run=not keys.reuse_run)
+        return self._finish_check(passed, cache, keys)
+
+    def _begin_check(
+        self, snapshot: Snapshot, cache: Optional[VerdictCache]
+    ) -> Tuple[Optional[bool], CheckKeys]:
+        """
+        Reset the per-check state and consult the cache.
+
+        Returns:
+            The verdict if the check is settled without running anything
+            (cancelled, or replayed from the cache), and the cache keys
+        """
+        self.failure = ""
+        self._cacheable = True
+        self.usage = None
+        self.snapshot = snapshot
+        keys = CheckKeys(None, None, False)
+        if self.cancelled:
+            return False, keys
+        if cache is None:
+            return None, keys
+
+        cache_key = self._cache_key(cache, snapshot.content)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return self._replay_verdict(cached), keys
+        runtime_key = self._runtime_key(cache, snapshot)
+        return None, CheckKeys(cache_key, runtime_key, self._ran_before(cache, runtime_key))
+
+    def _finish_check(self, passed: bool, cache: Optional[VerdictCache], keys: CheckKeys) -> bool:
+        """Cache a check's verdict (unless cancelled or not reproducible) and return it."""
+        if self.cancelled:
+            return False
+        if cache is not None and keys.cache_key is not None and self._cacheable:
+            with cache.batch():
+                cache.put(keys.cache_key, passed, self.failure)
+                if passed and keys.runtime_key is not None and not keys.reuse_run:
+                    cache.put(keys.runtime_key, True)
+        return passed
+
+    def cancel(self) -> None:
+        """
+        Abandon a running (or about to run) ``check`` from another thread.
+
+        The child the check is waiting on (ruff or the exercise, with its
+        whole process group, in either backend) is killed; the check then
+        returns False without reporting a failure or caching a verdict.
+        """
+        self.cancelled = True
+        child = self._child
+        if child is None:
+            return
+        process, group = child
+        try:
+            if group and hasattr(os, "killpg"):
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    # A backend run that doesn't lead its session yet
+                    os.kill(process.pid, signal.SIGKILL)
+            elif hasattr(os, "wait4"):
+                # Not Popen.kill: it could reap the child under the checking
+                # thread's wait4
+                os.kill(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def is_cached(self, cache: VerdictCache) -> bool:
+        """Whether the cache holds a verdict for the exercise's current content."""
+        return self._cache_key(cache, self.path.read_bytes()) in cache.entries
+
+    def _cache_key(self, cache: VerdictCache, raw_content: bytes) -> str:
+        """Build the verdict cache key for the given file content."""
+        backend = self.backend.name if self.backend else "subprocess"
+        return cache.make_key(
+            self.path, raw_content, f"timeout={RUN_TIMEOUT}", f"backend={backend}",
+            f"imports={self.dependency_hash}",
+        )
+
+    def _runtime_key(self, cache: VerdictCache, snapshot: Snapshot) -> Optional[str]:
+        """Build the cache key of a snapshot's runtime verdict (None: not normalizable)."""
+        content = snapshot.text
+        normalized = normalized_source_hash(content)
+        if normalized is None:
+            return None
+        backend = self.backend.name if self.backend else "subprocess"
+        # Limits are declared in the docstring, which normalization drops
+        limits = sorted(vars(ResourceLimits.from_source(content)).items())
+        return cache.make_runtime_key(
+            normalized, f"timeout={RUN_TIMEOUT}", f"backend={backend}",
+            f"imports={self.dependency_hash}", f"limits={limits}",
+        )
+
+    @staticmethod
+    def _ran_before(cache: Optional[VerdictCache], runtime_key: Optional[str]) -> bool:
+        """
+        Whether the same program already ran successfully.
+
+        Only successful runs are reused: a failure's traceback quotes line
+        numbers, which formatting edits change.
+        """
+        if cache is None or runtime_key is None:
+            return False
+        cached = cache.get(runtime_key)
+        return cached is not None and cached.get("passed", False)
+
+    def _check_content(self, snapshot: Snapshot, ruff_result: Optional[LintResult], run: bool = True) -> bool:
+        """
+        Run the TODO scan, ruff and the interpreter against a snapshot.
+
+        With ``run`` off the interpreter is skipped (the program is known to
+        run successfully) and only the TODO scan and ruff are redone.
+        """
+        content = snapshot.text
+        self.limits = ResourceLimits.from_source(content)
+
         # Check for TODO comments
-        content = self.get_content()
         if "# TODO" in content or "# FIXME" in content:
-            console.print(f"[yellow]Exercise {self.name} still has TODO items[/yellow]")
+            self._report_failure(f"[yellow]Exercise {self.name} still has TODO items[/yellow]")
             return False
 
         # Run ruff check
-        if not self._run_ruff_check():
+        if not self._run_ruff_check(snapshot, ruff_result):
             return False
 
         # Run the file
-        if not self._run_file():
+        if not run:
+            self._report_reused_run()
+        elif not self._run_file(snapshot):
             return False
 
-        console.print(f"[green]✅ {self.name} passed all checks![/green]")
+        self.console.print(f"[green]✅ {self.name} passed all checks![/green]")
         return True
 
-    def _run_ruff_check(self) -> bool:
-        """Run ruff check on the exercise."""
-        try:
-            result = subprocess.run(
-                ["ruff", "check", str(self.path)],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode != 0:
-                console.print(f"[red]Ruff check failed for {self.name}:[/red]")
-                console.print(result.stdout + result.stderr)
+    async def _check_content_async(
+        self, snapshot: Snapshot, ruff_result: Optional[LintResult], run: bool = True
+    ) -> bool:
+        """Async counterpart of ``_check_content`` running both phases at once."""
+        import asyncio
+
+        content = snapshot.text
+        self.limits = ResourceLimits.from_source(content)
+
+        # Check for TODO comments
+        if "# TODO" in content or "# FIXME" in content:
+            self._report_failure(f"[yellow]Exercise {self.name} still has TODO items[/yellow]")
+            return False
+
+        tasks = []
+        if ruff_result is not None:
+            if not self._run_ruff_check(snapshot, ruff_result):
                 return False
+        else:
+            tasks.append(asyncio.ensure_future(self._run_ruff_check_async(snapshot)))
+        if run:
+            tasks.append(asyncio.ensure_future(self._run_file_async(snapshot)))
+        else:
+            self._report_reused_run()
+
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if not all(task.result() for task in done):
+                    return False
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        self.console.print(f"[green]✅ {self.name} passed all checks![/green]")
+        return True
+
+    def _report_reused_run(self) -> None:
+        """Tell the user the run was skipped for a cosmetic edit."""
+        self.console.print(
+            f"[dim]{self.name} only changed in comments, docstrings or formatting; "
+            f"reusing its last successful run[/dim]"
+        )
+
+    def _replay_verdict(self, cached: dict) -> bool:
+        """Report a verdict taken from the cache instead of re-running checks."""
+        self.console.print(f"[dim]{self.name} is unchanged since it was last checked, reusing verdict[/dim]")
+        if cached.get("passed"):
+            self.console.print(f"[green]✅ {self.name} passed all checks![/green]")
             return True
+        self.failure = cached.get("output", "")
+        if self.failure:
+            self.console.print(self.failure)
+        return False
+
+    def _report_failure(self, message: str, details: str = "") -> None:
+        """Print a failure and remember it so it can be cached."""
+        self.console.print(message)
+        if details:
+            self.console.print(details)
+        self.failure = message + ("\n" + details if details else "")
+
+    def _run_ruff_check(self, snapshot: Snapshot, ruff_result: Optional[LintResult] = None) -> bool:
+        """Run ruff check on a snapshot, fed on stdin under the exercise's path."""
+        if ruff_result is not None:
+            passed, output = ruff_result
+            if not passed:
+                self._report_failure(f"[red]Ruff check failed for {self.name}:[/red]", output)
+            return passed
+
+        try:
+            process = subprocess.Popen(
+                ["ruff", "check", "--stdin-filename", str(self.path), "-"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
         except FileNotFoundError:
-            console.print("[red]Error: Ruff not found. Please install ruff.[/red]")
+            self.console.print("[red]Error: Ruff not found. Please install ruff.[/red]")
+            self._cacheable = False
             return False
 
-    def _run_file(self) -> bool:
-        """Run the exercise file."""
+        stdout, stderr = OutputBuffer(self.output_limit), OutputBuffer(self.output_limit)
+        self._child = (process, False)
         try:
-            result = subprocess.run(
-                [sys.executable, str(self.path)],
-                capture_output=True,
-                text=True,
-                timeout=10
+            communicate_with_usage(process, None, time.perf_counter(), stdout, stderr, snapshot.content)
+        finally:
+            self._child = None
+        if self.cancelled:
+            return False
+        if process.returncode != 0:
+            self._report_failure(
+                f"[red]Ruff check failed for {self.name}:[/red]",
+                stdout.text() + stderr.text(),
             )
-            if result.returncode != 0:
-                console.print(f"[red]Runtime error in {self.name}:[/red]")
-                console.print(result.stdout + result.stderr)
-                return False
-            return True
-        except subprocess.TimeoutExpired:
-            console.print(f"[red]Timeout: {self.name} took too long to run[/red]")
             return False
+        return True
+
+    def _output_buffer(self, live: bool = False) -> OutputBuffer:
+        """Create a bounded buffer for a child's output stream."""
+        return OutputBuffer(self.output_limit, echo=self._echo if live and self.live_output else None)
+
+    def _echo(self, text: str) -> None:
+        """Show a run's output as it arrives."""
+        self.console.file.write(text)
+        self.console.file.flush()
+
+    async def _communicate(
+        self,
+        process: "asyncio.subprocess.Process",
+        process_group: bool = False,
+        stdin: Optional[bytes] = None,
+    ) -> str:
+        """
+        Collect a child's output into bounded buffers, then make sure it is gone.
+
+        When ``process_group`` is set the child leads its own process group,
+        and everything left in that group is killed once the child exits (so
+        it can't keep the pipes open) or the wait is cancelled (timeout or a failing sibling check). ``stdin``
+        is written to the child's stdin pipe, which is then closed.
+
+        Returns:
+            The child's stdout followed by its stderr
+        """
+        import asyncio
+
+        stdout, stderr = self._output_buffer(live=process_group), self._output_buffer(live=process_group)
+
+        async def pump(stream: "asyncio.StreamReader", buffer: OutputBuffer) -> None:
+            while True:
+                data = await stream.read(32768)
+                if not data:
+                    return
+                buffer.write(data)
+
+        async def feed(data: bytes) -> None:
+            try:
+                process.stdin.write(data)
+                await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                process.stdin.close()
+
+        pumps = [pump(process.stdout, stdout), pump(process.stderr, stderr)]
+        if stdin is not None:
+            pumps.append(feed(stdin))
+        pumping = asyncio.ensure_future(asyncio.gather(*pumps))
+        group_killed = False
+        try:
+            # Anything the child started can hold its pipes open after it
+            # exits, so stop at the exit rather than waiting for their EOF
+            # (Process.wait only returns once the pipes are closed too)
+            while process.returncode is None and not pumping.done():
+                await asyncio.wait([pumping], timeout=EXIT_POLL_INTERVAL)
+            if process_group:
+                group_killed = True
+                self._report_strays(kill_process_group(process.pid, leader=process.pid))
+            await pumping
+            await process.wait()
+            return stdout.text() + stderr.text()
+        finally:
+            pumping.cancel()
+            if process_group and not group_killed:
+                self._report_strays(kill_process_group(process.pid, leader=process.pid))
+            if process.returncode is None:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+
+    async def _run_ruff_check_async(self, snapshot: Snapshot) -> bool:
+        """Run ruff check on a snapshot as an asyncio subprocess."""
+        import asyncio
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ruff", "check", "--stdin-filename", str(self.path), "-",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except FileNotFoundError:
+            self.console.print("[red]Error: Ruff not found. Please install ruff.[/red]")
+            self._cacheable = False
+            return False
+
+        output = await self._communicate(process, stdin=snapshot.content)
+        if process.returncode != 0:
+            self._report_failure(f"[red]Ruff check failed for {self.name}:[/red]", output)
+            return False
+        return True
+
+    async def _run_file_async(self, snapshot: Snapshot) -> bool:
+        """Run a snapshot of the exercise as an asyncio subprocess."""
+        import asyncio
+
+        if self.backend is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(None, self._run_file_in_backend, self.backend, snapshot)
+            except asyncio.CancelledError:
+                # Only the await is cancelled (say ruff failed first); kill
+                # the run the executor thread is still waiting on
+                self.cancel()
+                raise
+
+        started = time.perf_counter()
+        source = SourcePipe(self.path, snapshot.content, self.limits)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *source.command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+                pass_fds=source.pass_fds,
+            )
+        except Exception as e:
+            source.close()
+            self._report_failure(f"[red]Error running {self.name}: {e}[/red]")
+            self._cacheable = False
+            return False
+        source.feed()
+
+        try:
+            output = await asyncio.wait_for(
+                self._communicate(process, process_group=True), self.limits.timeout(RUN_TIMEOUT)
+            )
+        except asyncio.TimeoutError:
+            self._report_timeout()
+            return False
+        finally:
+            # The event loop reaps the child itself, so only wall time is known
+            self._report_usage(RunUsage(time.perf_counter() - started))
+        if process.returncode != 0:
+            self._report_runtime_error(process.returncode, output)
+            return False
+        return True
+
+    def _run_file_in_backend(self, backend: ForkServerBackend, snapshot: Snapshot) -> bool:
+        """Run a snapshot of the exercise in a pre-warmed interpreter."""
+        try:
+            returncode, output, strays, usage = backend.run(
+                self.path, self.limits.timeout(RUN_TIMEOUT), self.limits, self.output_limit,
+                snapshot.content, self._adopt_backend_run,
+            )
         except Exception as e:
-            console.print(f"[red]Error running {self.name}: {e}[/red]")
+            self._report_failure(f"[red]Error running {self.name}: {e}[/red]")
+            self._cacheable = False
+            return False
+        finally:
+            self._child = None
+        if self.cancelled:
             return False
+        self._report_strays(strays)
+        self._report_usage(usage)
+        return self._check_backend_result(returncode, output)
+
+    def _adopt_backend_run(self, process) -> None:
+        """Let ``cancel`` reach a run the backend just started."""
+        self._child = (process, True)
+        if self.cancelled:
+            # Cancelled while the run was being started
+            self.cancel()
+
+    def _check_backend_result(self, returncode: Optional[int], output: str) -> bool:
+        """Turn a backend's exit code and output into a verdict."""
+        if returncode is None:
+            self._report_timeout()
+            return False
+        if returncode != 0:
+            self._report_runtime_error(returncode, output)
+            return False
+        return True
+
+    def _kill_process_tree(self, process: subprocess.Popen, started: float) -> None:
+        """Kill an exercise's whole process group and reap the exercise."""
+        self._report_strays(kill_process_group(process.pid, leader=process.pid))
+        if not hasattr(os, "wait4"):
+            process.kill()
+            self._close_pipes(process)
+            return
+
+        # Reap with wait4 ourselves (Popen.kill would reap via poll and drop
+        # the rusage)
+        try:
+            os.kill(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            pass
+        else:
+            process.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+            self._report_usage(RunUsage.from_rusage(time.perf_counter() - started, usage))
+        self._close_pipes(process)
+
+    @staticmethod
+    def _close_pipes(process: subprocess.Popen) -> None:
+        """Drop a killed child's unread output and reap it."""
+        for stream in (process.stdout, process.stderr):
+            if stream is not None and not stream.closed:
+                stream.close()
+        process.wait()
+
+    def _report_timeout(self) -> None:
+        """Report a run that took too long, which says nothing about the next run."""
+        self._report_failure(f"[red]Timeout: {self.name} took too long to run[/red]")
+        # Likely a loaded machine (check-all) or a slow network, so the
+        # verdict isn't cached
+        self._cacheable = False
+
+    def _report_runtime_error(self, returncode: Optional[int], output: str) -> None:
+        """Report a run that exited with an error or was killed by a signal."""
+        self._report_failure(f"[red]Runtime error in {self.name}:[/red]", output + _signal_note(returncode))
+        if returncode is not None and returncode < 0:
+            # Killed from outside (OOM killer, a limit hit under load): may
+            # not happen again
+            self._cacheable = False
+
+    def _report_usage(self, usage: RunUsage) -> None:
+        """Remember and show the resources a run used."""
+        self.usage = usage
+        self.console.print(f"[dim]⏱  {usage.describe()}[/dim]")
+
+    def _report_strays(self, count: int) -> None:
+        """Tell the user about processes an exercise left running."""
+        if count:
+            self.console.print(
+                f"[yellow]Cleaned up {count} stray process(es) left by {self.name}[/yellow]"
+            )
+
+    def _run_file(self, snapshot: Snapshot) -> bool:
+        """Run a snapshot of the exercise."""
+        if self.cancelled:
+            return False
+        if self.backend is not None:
+            return self._run_file_in_backend(self.backend, snapshot)
+
+        source = SourcePipe(self.path, snapshot.content, self.limits)
+        try:
+            # Run in its own session so anything the exercise spawns can be
+            # killed along with it
+            started = time.perf_counter()
+            process = subprocess.Popen(
+                source.command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True,
+                pass_fds=source.pass_fds,
+            )
+        except Exception as e:
+            source.close()
+            self._report_failure(f"[red]Error running {self.name}: {e}[/red]")
+            self._cacheable = False
+            return False
+        source.feed()
+
+        self._child = (process, True)
+        if self.cancelled:
+            # Cancelled while the run was being started
+            self.cancel()
+        strays: List[int] = []
+        try:
+            stdout, stderr = self._output_buffer(live=True), self._output_buffer(live=True)
+            usage = communicate_with_usage(
+                process, self.limits.timeout(RUN_TIMEOUT), started, stdout, stderr,
+                on_exit=lambda: strays.append(kill_process_group(process.pid, leader=process.pid)),
+            )
+        except subprocess.TimeoutExpired:
+            self._kill_process_tree(process, started)
+            self._report_timeout()
+            return False
+        except BaseException:
+            self._kill_process_tree(process, started)
+            raise
+        finally:
+            self._child = None
+
+        if self.cancelled:
+            return False
+        self._report_strays(sum(strays))
+        self._report_usage(usage)
+        if process.returncode != 0:
+            self._report_runtime_error(process.returncode, stdout.text() + stderr.text())
+            return False
+        return True
+
         # Run ruff check
         ruff_passed, ruff_output = self.run_ruff_check()
         if not ruff_passed:
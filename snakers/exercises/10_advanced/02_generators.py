@@ -14,6 +14,10 @@ Topics covered:
 - Lazy evaluation
 - Generator expressions
 - Infinite sequences
+
+Limits:
+- cpu: 5
+- memory: 512M
 """
 
 from typing import Iterator, List, Dict, Any, Generator
@@ -0,0 +1,200 @@
+"""
+Content-addressed history of passing solutions.
+
+Every passing version of an exercise is kept. Contents are stored once per
+distinct content, as ``objects/<hash[:2]>/<hash[2:]>`` under the history
+directory, and a SQLite index maps (learner, exercise, version) to a
+content hash. Re-saving code identical to the latest version adds nothing,
+and identical code saved by several learners or for several versions is
+stored once.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from rich.console import Console
+
+console = Console()
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    learner TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    saved_at REAL NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (learner, exercise, version)
+);
+CREATE INDEX IF NOT EXISTS solutions_learner_name ON solutions (learner, name, version);
+CREATE INDEX IF NOT EXISTS solutions_hash ON solutions (hash);
+"""
+
+
+def default_history_dir() -> Path:
+    """Solution history from ``SNAKERS_SOLUTIONS_DIR``, or one in the home directory."""
+    history_dir = os.environ.get("SNAKERS_SOLUTIONS_DIR")
+    if history_dir:
+        return Path(history_dir).expanduser()
+    return Path.home() / ".snakers_solutions"
+
+
+class SolutionHistory:
+    """One learner's passing solutions, every version, deduplicated by content."""
+
+    def __init__(self, history_dir: Path, learner: str, legacy_dir: Optional[Path] = None):
+        """
+        Args:
+            history_dir: Directory holding the objects and the index database
+            learner: Learner the solutions belong to
+            legacy_dir: Old one-copy-per-exercise solutions directory, imported
+                when the history is first created
+        """
+        self.history_dir = history_dir
+        self.objects_dir = history_dir / "objects"
+        self.learner = learner
+        self._lock = threading.Lock()
+        history_dir.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(history_dir / "index.db"), timeout=10, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        if self._create_schema() and legacy_dir is not None:
+            self._migrate_legacy(legacy_dir)
+
+    def _create_schema(self) -> bool:
+        """Create the schema; True if the database was new."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            if self._db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+                return False
+            # executescript() would commit the open transaction first
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    self._db.execute(statement)
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            return True
+
+    def _migrate_legacy(self, legacy_dir: Path) -> None:
+        """Import the solutions saved before the history existed."""
+        count = 0
+        for path in sorted(legacy_dir.glob("**/*.py")):
+            try:
+                content = path.read_bytes()
+                saved_at = path.stat().st_mtime
+            except OSError:
+                continue
+            relative_path = path.relative_to(legacy_dir).as_posix()
+            if self.save(relative_path, path.stem, content, saved_at=saved_at) is not None:
+                count += 1
+        if count:
+            console.print(f"[blue]Imported {count} saved solutions into {self.history_dir}[/blue]")
+
+    def _object_path(self, content_hash: str) -> Path:
+        """Where the content with a hash is stored."""
+        return self.objects_dir / content_hash[:2] / content_hash[2:]
+
+    def _write_object(self, content_hash: str, content: bytes) -> None:
+        """Store content unless it is already stored."""
+        path = self._object_path(content_hash)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            temp_path.write_bytes(content)
+            os.replace(temp_path, path)
+
+    def save(self, exercise: str, name: str, content: bytes, saved_at: Optional[float] = None) -> Optional[int]:
+        """
+        Record a passing version of an exercise.
+
+        Args:
+            exercise: Exercise relative path
+            name: Exercise name
+            content: Source that passed
+            saved_at: Time of the version (default: now)
+
+        Returns:
+            The new version number, or None if the content is identical to
+            the latest version
+        """
+        content_hash = hashlib.sha256(content).hexdigest()
+        with self._lock, self._db:
+            # The write lock also keeps a concurrent reset from deleting the
+            # object between writing it and referencing it
+            self._db.execute("BEGIN IMMEDIATE")
+            latest = self._db.execute(
+                "SELECT version, hash FROM solutions WHERE learner = ? AND exercise = ? "
+                "ORDER BY version DESC LIMIT 1",
+                (self.learner, exercise),
+            ).fetchone()
+            if latest is not None and latest["hash"] == content_hash:
+                return None
+            version = latest["version"] + 1 if latest is not None else 1
+            self._write_object(content_hash, content)
+            self._db.execute(
+                "INSERT INTO solutions (learner, exercise, name, version, saved_at, hash) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.learner, exercise, name, version, saved_at or time.time(), content_hash),
+            )
+        return version
+
+    def versions(self, exercise: str) -> List[sqlite3.Row]:
+        """Every saved version of an exercise (by name or relative path), oldest first."""
+        column = "exercise" if exercise.endswith(".py") else "name"
+        with self._lock:
+            return self._db.execute(
+                f"SELECT * FROM solutions WHERE learner = ? AND {column} = ? ORDER BY exercise, version",
+                (self.learner, exercise),
+            ).fetchall()
+
+    def get(self, exercise: str, version: Optional[int] = None) -> Optional[Tuple[sqlite3.Row, bytes]]:
+        """
+        A saved version of an exercise and its content.
+
+        Args:
+            exercise: Exercise name or relative path
+            version: Version number (default: the latest)
+        """
+        versions = self.versions(exercise)
+        if version is not None:
+            versions = [row for row in versions if row["version"] == version]
+        if not versions:
+            return None
+        row = versions[-1]
+        try:
+            return row, self._object_path(row["hash"]).read_bytes()
+        except OSError:
+            console.print(f"[red]Error: Stored solution {row['hash']} is missing[/red]")
+            return None
+
+    def latest(self) -> List[sqlite3.Row]:
+        """The latest version of every exercise with a saved solution, with version counts."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT exercise, name, MAX(version) AS version, MAX(saved_at) AS saved_at "
+                "FROM solutions WHERE learner = ? GROUP BY exercise ORDER BY exercise",
+                (self.learner,),
+            ).fetchall()
+
+    def reset(self) -> None:
+        """Forget this learner's solutions, deleting objects nobody else references."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            hashes = {
+                row["hash"]
+                for row in self._db.execute("SELECT DISTINCT hash FROM solutions WHERE learner = ?", (self.learner,))
+            }
+            self._db.execute("DELETE FROM solutions WHERE learner = ?", (self.learner,))
+            for content_hash in hashes:
+                if self._db.execute("SELECT 1 FROM solutions WHERE hash = ? LIMIT 1", (content_hash,)).fetchone():
+                    continue
+                try:
+                    self._object_path(content_hash).unlink()
+                except OSError:
+                    pass
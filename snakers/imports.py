@@ -0,0 +1,149 @@
+"""
+Static import graph of the exercise tree.
+
+Exercises may import helper modules and packages that sit next to them
+(``09_modules_packages/my_package``). When such a module changes, every
+exercise that imports it, directly or through other modules, has to be
+re-checked. Imports are found with ``ast`` when the manifest (re)reads a
+file, stored in the manifest as candidate files, and turned into a graph
+over the files that actually exist.
+"""
+
+import ast
+import posixpath
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def _module_candidates(base: str, parts: List[str]) -> List[str]:
+    """Files that importing dotted module ``parts`` from directory ``base`` may load."""
+    candidates = []
+    directory = base
+    for part in parts:
+        # Importing a.b.c runs a/__init__.py and a/b/__init__.py first
+        candidates.append(posixpath.join(directory, part + ".py"))
+        directory = posixpath.join(directory, part)
+        candidates.append(posixpath.join(directory, "__init__.py"))
+    return [posixpath.normpath(candidate) for candidate in candidates]
+
+
+def find_imports(source: str, key: str, package: Optional[str] = None) -> List[str]:
+    """
+    List the exercise-tree files a module may import.
+
+    Args:
+        source: Module source
+        key: The module's path relative to the exercises directory
+        package: Outermost package directory the module belongs to, if any
+
+    Returns:
+        Sorted relative paths of every local file an import statement
+        anywhere in the module could load (nonexistent ones included; the
+        graph only keeps files that exist). Empty if the source does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+
+    directory = posixpath.dirname(key)
+    # Absolute imports resolve against the script's directory: the one
+    # holding the outermost package, or the module's own directory
+    base = posixpath.dirname(package) if package else directory
+
+    candidates: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                candidates.update(_module_candidates(base, alias.name.split(".")))
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                origin = directory
+                for _ in range(node.level - 1):
+                    origin = posixpath.dirname(origin)
+                parts = node.module.split(".") if node.module else []
+                if parts:
+                    candidates.update(_module_candidates(origin, parts))
+                else:
+                    candidates.add(posixpath.normpath(posixpath.join(origin, "__init__.py")))
+            elif node.module:
+                origin, parts = base, node.module.split(".")
+                candidates.update(_module_candidates(origin, parts))
+            else:
+                continue
+            # ``from package import name`` may import a submodule
+            package_dir = posixpath.join(origin, *parts)
+            for alias in node.names:
+                if alias.name != "*":
+                    candidates.update(_module_candidates(package_dir, [alias.name]))
+    candidates.discard(key)
+    return sorted(candidates)
+
+
+class ImportGraph:
+    """Which local files import which, over the files currently in the tree."""
+
+    def __init__(self, imports: Iterable[Tuple[str, Iterable[str]]]):
+        """
+        Args:
+            imports: ``(file, candidate imports)`` pairs for every file in the tree
+        """
+        edges = {key: list(candidates) for key, candidates in imports}
+        self.imports: Dict[str, Set[str]] = {
+            key: {candidate for candidate in candidates if candidate in edges}
+            for key, candidates in edges.items()
+        }
+        self.importers: Dict[str, Set[str]] = defaultdict(set)
+        for key, imported in self.imports.items():
+            for module in imported:
+                self.importers[module].add(key)
+
+    def dependencies(self, key: str) -> List[str]:
+        """Every file a file imports, directly or transitively, in path order."""
+        seen: Set[str] = set()
+        stack = [key]
+        while stack:
+            for module in self.imports.get(stack.pop(), ()):
+                if module not in seen and module != key:
+                    seen.add(module)
+                    stack.append(module)
+        return sorted(seen)
+
+    def affected(self, key: str) -> List[str]:
+        """
+        Files to re-check after a file changed, in dependency order.
+
+        Returns:
+            The file and everything that imports it directly or transitively,
+            each listed after the modules it imports (cycles are broken in
+            path order)
+        """
+        affected = {key}
+        stack = [key]
+        while stack:
+            for importer in self.importers.get(stack.pop(), ()):
+                if importer not in affected:
+                    affected.add(importer)
+                    stack.append(importer)
+
+        # Kahn's algorithm over the affected subgraph
+        waiting = {node: len(self.imports.get(node, set()) & affected) for node in affected}
+        ready = sorted(node for node, count in waiting.items() if count == 0)
+        order: List[str] = []
+        done: Set[str] = set()
+        while len(order) < len(affected):
+            if not ready:
+                # Import cycle: release the first remaining file in path order
+                ready = [min(node for node in affected if node not in done)]
+            node = ready.pop(0)
+            if node in done:
+                continue
+            order.append(node)
+            done.add(node)
+            for importer in sorted(self.importers.get(node, ())):
+                if importer in affected and importer not in done:
+                    waiting[importer] -= 1
+                    if waiting[importer] == 0:
+                        ready.append(importer)
+            ready.sort()
+        return order
@@ -0,0 +1,367 @@
+"""
+Exercise manifest: a persistent index of the exercise tree.
+
+Discovering exercises used to mean a recursive glob and a fresh walk on
+every command. The manifest remembers each file's size, mtime, content hash
+and the metadata parsed from its source (title, category, order, package
+membership, declared limits, TODO count and local imports). It is written by ``snakers
+init`` and revalidated with one ``os.scandir`` pass per command (a stat per
+entry, no file reads for unchanged files), with dict lookups by name and by
+relative path.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rich.console import Console
+
+from .imports import ImportGraph, find_imports
+from .limits import ResourceLimits
+
+console = Console()
+
+MANIFEST_VERSION = 3
+MANIFEST_FILE = ".snakers_manifest.json"
+
+TITLE_LINE = re.compile(r"^\s*Exercise(?:\s+[\d.]+)?:\s*(.+?)\s*$", re.MULTILINE)
+ORDER_PREFIX = re.compile(r"^(\d+)_")
+
+
+def default_manifest_file(exercise_dir: Path) -> Path:
+    """
+    Where the manifest of an exercise directory is kept.
+
+    Next to the exercises when the directory is writable, otherwise (say an
+    installed package) in a per-directory file under the home directory.
+    """
+    if os.access(exercise_dir, os.W_OK):
+        return exercise_dir / MANIFEST_FILE
+    digest = hashlib.sha256(str(exercise_dir.resolve()).encode()).hexdigest()[:16]
+    return Path.home() / ".snakers_manifests" / f"{digest}.json"
+
+
+class IndexEntry:
+    """One file as recorded in the manifest."""
+
+    __slots__ = (
+        "path", "relative_path", "name", "category", "size", "mtime_ns", "content_hash",
+        "title", "order", "package", "limits", "todo_count", "imports",
+    )
+
+    def __init__(
+        self,
+        path: Path,
+        relative_path: str,
+        name: str,
+        category: str,
+        size: int,
+        mtime_ns: int,
+        content_hash: str,
+        title: str,
+        order: Optional[int] = None,
+        package: Optional[str] = None,
+        limits: Optional[Dict[str, float]] = None,
+        todo_count: int = 0,
+        imports: Optional[List[str]] = None,
+    ):
+        self.path = path
+        self.relative_path = relative_path
+        self.name = name
+        self.category = category
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.content_hash = content_hash
+        self.title = title
+        self.order = order
+        # Package directory (relative to the exercises) the file belongs to;
+        # such files are helper modules, not exercises
+        self.package = package
+        self.limits = limits or {}
+        self.todo_count = todo_count
+        # Exercise-tree files the source may import (see imports.find_imports)
+        self.imports = imports or []
+
+    @property
+    def is_exercise(self) -> bool:
+        """Whether the file is an exercise rather than a package helper module."""
+        return self.package is None
+
+    @classmethod
+    def from_file(cls, path: Path, key: str, stat: os.stat_result, package: Optional[str]) -> "IndexEntry":
+        """Build an entry by reading and parsing a file (``key`` is its manifest key)."""
+        content = path.read_bytes()
+        text = content.decode("utf-8", errors="replace")
+        title = TITLE_LINE.search(text)
+        order = ORDER_PREFIX.match(path.stem)
+        limits = ResourceLimits.from_source(text)
+        return cls(
+            path,
+            # Same form as Exercise.relative_path, so progress keys match
+            str(path.relative_to(path.parent.parent)),
+            path.stem,
+            key.split("/", 1)[0] if "/" in key else "",
+            stat.st_size,
+            stat.st_mtime_ns,
+            hashlib.sha256(content).hexdigest(),
+            title.group(1) if title else path.stem,
+            int(order.group(1)) if order else None,
+            package,
+            {name: value for name, value in vars(limits).items() if value is not None},
+            sum(1 for line in text.splitlines() if "# TODO" in line or "# FIXME" in line),
+            find_imports(text, key, package),
+        )
+
+    @classmethod
+    def from_dict(cls, path: Path, data: dict) -> "IndexEntry":
+        """Rebuild an entry from its stored form."""
+        return cls(
+            path,
+            data["relative_path"],
+            data["name"],
+            data["category"],
+            data["size"],
+            data["mtime_ns"],
+            data["content_hash"],
+            data["title"],
+            data.get("order"),
+            data.get("package"),
+            data.get("limits"),
+            data.get("todo_count", 0),
+            data.get("imports"),
+        )
+
+    def to_dict(self) -> dict:
+        """Stored form of the entry (the path is the key)."""
+        return {
+            "relative_path": self.relative_path,
+            "name": self.name,
+            "category": self.category,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "content_hash": self.content_hash,
+            "title": self.title,
+            "order": self.order,
+            "package": self.package,
+            "limits": self.limits,
+            "todo_count": self.todo_count,
+            "imports": self.imports,
+        }
+
+    def matches(self, stat: os.stat_result) -> bool:
+        """Whether the file still looks the way it did when indexed."""
+        return self.size == stat.st_size and self.mtime_ns == stat.st_mtime_ns
+
+
+class ExerciseIndex:
+    """
+    Files under an exercise directory, cached in a manifest between runs.
+
+    Manifest keys are paths relative to the exercise directory, so a
+    manifest written by ``snakers init`` stays valid wherever the exercises
+    end up.
+    """
+
+    def __init__(self, exercise_dir: Path, manifest_file: Optional[Path] = None):
+        self.exercise_dir = exercise_dir
+        self.manifest_file = manifest_file or default_manifest_file(exercise_dir)
+        self._lock = threading.Lock()
+        self.entries: List[IndexEntry] = []
+        self.by_name: Dict[str, IndexEntry] = {}
+        self.by_path: Dict[str, IndexEntry] = {}
+        self._graph: Optional[ImportGraph] = None
+        self._stored = self.load()
+
+    def load(self) -> Dict[str, IndexEntry]:
+        """Load the stored entries, keyed by path relative to the exercises."""
+        if not self.manifest_file.exists():
+            return {}
+        try:
+            with open(self.manifest_file) as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                return {}
+            return {
+                key: IndexEntry.from_dict(self.exercise_dir / key, entry)
+                for key, entry in data.get("files", {}).items()
+            }
+        except (json.JSONDecodeError, IOError, AttributeError, KeyError, TypeError):
+            console.print("[yellow]Warning: Could not load exercise manifest[/yellow]")
+            return {}
+
+    def save(self) -> None:
+        """Write the manifest."""
+        data = {"version": MANIFEST_VERSION, "files": {key: entry.to_dict() for key, entry in self._stored.items()}}
+        # Replaced atomically: another snakers process may be loading it
+        temp_path = self.manifest_file.with_name(
+            f"{self.manifest_file.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w") as f:
+                json.dump(data, f, indent=1)
+            os.replace(temp_path, self.manifest_file)
+        except IOError as e:
+            console.print(f"[yellow]Warning: Could not save exercise manifest: {e}[/yellow]")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+
+    def refresh(self) -> List[IndexEntry]:
+        """
+        Revalidate the manifest against the directory tree.
+
+        Unchanged files (same size and mtime) keep their stored entry; new or
+        modified files are re-read. The manifest is only rewritten when
+        something changed.
+
+        Returns:
+            All exercise entries sorted by path, helper modules excluded
+        """
+        with self._lock:
+            changed = False
+            current: Dict[str, IndexEntry] = {}
+            for path, stat, package in self._scan(self.exercise_dir, None):
+                key = path.relative_to(self.exercise_dir).as_posix()
+                entry = self._stored.get(key)
+                if entry is None or not entry.matches(stat):
+                    try:
+                        entry = IndexEntry.from_file(path, key, stat, package)
+                    except OSError:
+                        # Deleted between the scan and the read
+                        continue
+                    changed = True
+                elif entry.package != package:
+                    # An __init__.py appeared or went away, which changes how
+                    # the file's absolute imports resolve
+                    try:
+                        entry = IndexEntry.from_file(path, key, stat, package)
+                    except OSError:
+                        continue
+                    changed = True
+                current[key] = entry
+            self.entries = sorted(current.values(), key=lambda entry: entry.path)
+            if changed or current.keys() != self._stored.keys():
+                self._stored = current
+                self._graph = None
+                self.save()
+            self._build_lookups()
+            return [entry for entry in self.entries if entry.is_exercise]
+
+    def seed(self, entries: Dict[str, dict], keys: Iterable[str]) -> None:
+        """
+        Adopt stored entries for files known to hold the content they describe.
+
+        Used after installing from an exercise pack, whose index already has
+        the entries, so the next refresh doesn't read the files again.
+
+        Args:
+            entries: Stored entries (as in the manifest) by relative path
+            keys: Relative paths of files whose content matches their entry
+        """
+        with self._lock:
+            for key in keys:
+                data = entries.get(key)
+                if data is None:
+                    continue
+                path = self.exercise_dir / key
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                data = dict(data, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                self._stored[key] = IndexEntry.from_dict(path, data)
+            self._graph = None
+            self.save()
+
+    def _build_lookups(self) -> None:
+        """Rebuild the name and relative path dicts from the entries."""
+        self.by_name = {}
+        self.by_path = {}
+        for entry in self.entries:
+            self.by_path[entry.relative_path] = entry
+            if entry.is_exercise:
+                # The first exercise in path order wins a shared name, as the
+                # old linear scan did
+                self.by_name.setdefault(entry.name, entry)
+
+    def find(self, name: str) -> Optional[IndexEntry]:
+        """Look an exercise up by name or relative path."""
+        entry = self.by_name.get(name) or self.by_path.get(name)
+        return entry if entry is not None and entry.is_exercise else None
+
+    def import_graph(self) -> ImportGraph:
+        """Import graph of the files as of the last refresh, rebuilt only after changes."""
+        with self._lock:
+            if self._graph is None:
+                self._graph = ImportGraph((key, entry.imports) for key, entry in self._stored.items())
+            return self._graph
+
+    def affected_by(self, path: Path) -> List[IndexEntry]:
+        """
+        Exercises to re-check after a file changed.
+
+        Returns:
+            The file itself (if it is an exercise) and every exercise that
+            imports it directly or through other modules, dependencies first
+        """
+        try:
+            key = path.relative_to(self.exercise_dir).as_posix()
+        except ValueError:
+            return []
+        entries = (self._stored.get(affected) for affected in self.import_graph().affected(key))
+        return [entry for entry in entries if entry is not None and entry.is_exercise]
+
+    def dependency_hash(self, path: Path) -> str:
+        """
+        Hash of the content of every local module a file imports.
+
+        Folded into the verdict cache key, so an exercise is re-run (not
+        replayed from the cache) when a helper module it imports changes.
+        """
+        try:
+            key = path.relative_to(self.exercise_dir).as_posix()
+        except ValueError:
+            return ""
+        dependencies = self.import_graph().dependencies(key)
+        if not dependencies:
+            return ""
+        digest = hashlib.sha256()
+        for dependency in dependencies:
+            digest.update(f"{dependency}\0{self._stored[dependency].content_hash}\0".encode())
+        return digest.hexdigest()
+
+    def entry_for(self, path: Path) -> Optional[IndexEntry]:
+        """The entry of a file, exercise or helper module."""
+        try:
+            key = path.relative_to(self.exercise_dir).as_posix()
+        except ValueError:
+            return None
+        return self._stored.get(key)
+
+    @staticmethod
+    def _scan(
+        directory: Path, package: Optional[str], root: Optional[Path] = None
+    ) -> Iterator[Tuple[Path, os.stat_result, Optional[str]]]:
+        """Yield every ``.py`` file below a directory with its stat result and package."""
+        root = root or directory
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            return
+        if package is None and directory != root and any(entry.name == "__init__.py" for entry in entries):
+            package = directory.relative_to(root).as_posix()
+        for entry in entries:
+            if entry.is_dir():
+                yield from ExerciseIndex._scan(Path(entry.path), package, root)
+            elif entry.name.endswith(".py") and entry.is_file():
+                try:
+                    yield Path(entry.path), entry.stat(), package
+                except OSError:
+                    continue
@@ -4,12 +4,15 @@ Initialization module for Snakers.
 This module handles creating the initial directory structure and exercise files.
 """
 
-import shutil
 from pathlib import Path
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 
+from .index import MANIFEST_FILE, ExerciseIndex
+from .pack import default_pack
+from .sync import MODIFIED, NEW, UNCHANGED, UPDATED, DirectorySource, sync_exercises
+
 console = Console()
 
 # Define the basic directory structure
@@ -37,12 +40,14 @@ DIRECTORY_STRUCTURE = [
     "solutions"
 ]
 
-def initialize_snakers(target_dir: Path) -> None:
+def initialize_snakers(target_dir: Path, update: bool = False) -> None:
     """
     Initialize the Snakers directory structure and copy exercise files.
 
     Args:
         target_dir: Target directory for initialization
+        update: Only add new exercise files and refresh the ones the learner
+            hasn't modified, instead of overwriting every file
     """
     console.print(f"[bold green]Initializing Snakers in {target_dir}[/bold green]")
 
@@ -65,10 +70,19 @@ def initialize_snakers(target_dir: Path) -> None:
         # Find source exercise files
         package_dir = Path(__file__).parent
         exercises_dir = package_dir / "exercises"
-
-        if exercises_dir.exists() and any(exercises_dir.glob("**/*.py")):
+        pack = default_pack()
+        if pack is not None and not pack.matches(exercises_dir):
+            console.print("[yellow]Warning: The exercise pack is out of date, using the exercise files instead[/yellow]")
+            pack.close()
+            pack = None
+
+        if pack is not None:
+            # Extract from the shipped exercise pack
+            source = pack
+            console.print("[green]Using the exercise pack...[/green]")
+        elif exercises_dir.exists() and any(exercises_dir.glob("**/*.py")):
             # Copy from actual exercises directory
-            source_dir = exercises_dir
+            source = DirectorySource(exercises_dir)
             console.print("[green]Using existing exercise files...[/green]")
         else:
             # Fall back to templates or create them
@@ -76,30 +90,49 @@ def initialize_snakers(target_dir: Path) -> None:
             if not template_dir.exists() or not any(template_dir.glob("**/*.py")):
                 console.print("[yellow]No exercise files found. Creating templates...[/yellow]")
                 create_template_directory()
-            source_dir = template_dir
+            source = DirectorySource(template_dir)
 
         # Count exercise files to copy
-        exercise_files = list(source_dir.glob("**/*.py")) + list(source_dir.glob("**/*.md"))
+        exercise_files = source.keys()
 
         if not exercise_files:
             console.print("[red]Error: No exercise files found.[/red]")
             console.print("Directories have been created. You may need to add exercise files manually.")
             return
 
-        console.print(f"[green]Found {len(exercise_files)} exercise files to copy.[/green]")
-        copy_task = progress.add_task("[bold blue]Copying exercise files...", total=len(exercise_files))
-
-        for source_file in exercise_files:
-            # Determine target location preserving directory structure
-            rel_path = source_file.relative_to(source_dir)
-            dest_path = target_dir / "exercises" / rel_path
-
-            # Create parent directories if needed
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Copy the file
-            shutil.copy2(source_file, dest_path)
-            progress.update(copy_task, advance=1)
+        console.print(f"[green]Found {len(exercise_files)} exercise files to {'sync' if update else 'copy'}.[/green]")
+        copy_task = progress.add_task(
+            "[bold blue]Syncing exercise files..." if update else "[bold blue]Copying exercise files...",
+            total=len(exercise_files),
+        )
+
+        results = sync_exercises(
+            source,
+            target_dir / "exercises",
+            exercise_files,
+            update=update,
+            on_progress=lambda key, outcome: progress.update(copy_task, advance=1),
+        )
+
+    if update:
+        console.print(
+            f"[green]{len(results[NEW])} new, {len(results[UPDATED])} updated, "
+            f"{len(results[UNCHANGED])} unchanged.[/green]"
+        )
+        if results[MODIFIED]:
+            console.print(f"[yellow]Kept {len(results[MODIFIED])} files you modified:[/yellow]")
+            for key in results[MODIFIED]:
+                console.print(f"  {key}")
+
+    # Index the copied exercises so the first run doesn't have to (from the
+    # pack's index, for the files that hold the packed content)
+    exercises_target = target_dir / "exercises"
+    exercise_index = ExerciseIndex(exercises_target, exercises_target / MANIFEST_FILE)
+    if pack is not None:
+        exercise_index.seed(pack.manifest_entries(), results[NEW] + results[UPDATED] + results[UNCHANGED])
+        pack.close()
+    exercises = exercise_index.refresh()
+    console.print(f"[green]Wrote manifest for {len(exercises)} exercises.[/green]")
 
     # Create a README file
     readme_path = target_dir / "README.md"
@@ -0,0 +1,104 @@
+"""
+Per-exercise resource limits declared in the exercise docstring.
+
+An exercise can cap the resources its run may use with a ``Limits:`` block
+alongside its ``Tasks:`` and ``Hints:``::
+
+    Limits:
+    - cpu: 5          CPU seconds
+    - wall: 10        wall-clock seconds
+    - memory: 512M    address space (K, M or G suffix)
+    - files: 64       open file descriptors
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+LIMIT_LINE = re.compile(r"^\s*-?\s*(cpu|wall|memory|files)\s*:\s*([0-9.]+)\s*([KMG]?)", re.IGNORECASE)
+SIZE_SUFFIXES = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+class ResourceLimits:
+    """Resource limits applied to an exercise run."""
+
+    def __init__(
+        self,
+        cpu: Optional[int] = None,
+        wall: Optional[float] = None,
+        memory: Optional[int] = None,
+        files: Optional[int] = None,
+    ):
+        self.cpu = cpu
+        self.wall = wall
+        self.memory = memory
+        self.files = files
+
+    def __bool__(self) -> bool:
+        return any(value is not None for value in (self.cpu, self.wall, self.memory, self.files))
+
+    def __repr__(self) -> str:
+        return (
+            f"ResourceLimits(cpu={self.cpu}, wall={self.wall}, "
+            f"memory={self.memory}, files={self.files})"
+        )
+
+    @classmethod
+    def from_source(cls, content: str) -> "ResourceLimits":
+        """Parse the ``Limits:`` block of an exercise's source, if any."""
+        limits = cls()
+        in_block = False
+        for line in content.splitlines():
+            stripped = line.strip()
+            if stripped == "Limits:":
+                in_block = True
+                continue
+            if not in_block:
+                continue
+            match = LIMIT_LINE.match(line)
+            if not match:
+                break
+            key, number, suffix = match.group(1).lower(), match.group(2), match.group(3).upper()
+            if key == "wall":
+                limits.wall = float(number)
+            elif key == "memory":
+                limits.memory = int(float(number) * SIZE_SUFFIXES[suffix])
+            else:
+                setattr(limits, key, int(float(number)))
+        return limits
+
+    def timeout(self, default: float) -> float:
+        """Wall-clock seconds the run may take."""
+        return self.wall if self.wall is not None else default
+
+    def rlimits(self) -> List[Tuple[str, int, int]]:
+        """The ``resource`` limits to set, as (``RLIMIT_*`` name, soft, hard)."""
+        limits = []
+        if self.cpu is not None:
+            # SIGXCPU at the soft limit, SIGKILL a second later
+            limits.append(("RLIMIT_CPU", self.cpu, self.cpu + 1))
+        if self.memory is not None:
+            limits.append(("RLIMIT_AS", self.memory, self.memory))
+        if self.files is not None:
+            limits.append(("RLIMIT_NOFILE", self.files, self.files))
+        return limits
+
+    def apply(self) -> None:
+        """Apply the limits to the current process (call in the child)."""
+        if resource is None:
+            return
+        for name, soft, hard in self.rlimits():
+            _set_limit(getattr(resource, name), soft, hard)
+
+
+def _set_limit(kind: int, soft: int, hard: int) -> None:
+    """Lower a resource limit without trying to raise the current hard limit."""
+    _, current_hard = resource.getrlimit(kind)
+    if current_hard != resource.RLIM_INFINITY:
+        soft = min(soft, current_hard)
+        hard = min(hard, current_hard)
+    resource.setrlimit(kind, (soft, hard))
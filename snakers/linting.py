@@ -0,0 +1,250 @@
+"""
+Ruff integration shared by single-exercise and whole-tree checks.
+"""
+
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from rich.console import Console
+
+console = Console()
+
+LintResult = Tuple[bool, str]
+
+
+def format_diagnostic(diagnostic: dict) -> str:
+    """Format a ruff JSON diagnostic the way `ruff check --output-format concise` does."""
+    location = diagnostic.get("location") or {}
+    code = diagnostic.get("code") or "SyntaxError"
+    return (
+        f"{diagnostic.get('filename')}:{location.get('row', 0)}:"
+        f"{location.get('column', 0)}: {code} {diagnostic.get('message', '')}"
+    )
+
+
+def run_ruff_batch(target: Path) -> Optional[Dict[Path, LintResult]]:
+    """
+    Run ruff once over a whole directory and split the diagnostics per file.
+
+    Args:
+        target: Directory (or file) to lint
+
+    Returns:
+        Mapping of resolved file path to a ``(passed, output)`` pair for every
+        file that has diagnostics, or None if ruff could not be run. Files
+        missing from the mapping passed.
+    """
+    try:
+        result = subprocess.run(
+            ["ruff", "check", "--output-format", "json", "--exit-zero", str(target)],
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        console.print("[red]Error: Ruff not found. Please install ruff.[/red]")
+        return None
+
+    if result.returncode != 0:
+        console.print("[yellow]Warning: batch ruff check failed, falling back to per-file checks[/yellow]")
+        return None
+
+    try:
+        diagnostics = json.loads(result.stdout or "[]")
+    except json.JSONDecodeError:
+        console.print("[yellow]Warning: could not parse ruff output, falling back to per-file checks[/yellow]")
+        return None
+
+    grouped: Dict[Path, List[str]] = {}
+    for diagnostic in diagnostics:
+        filename = Path(diagnostic.get("filename", "")).resolve()
+        grouped.setdefault(filename, []).append(format_diagnostic(diagnostic))
+
+    return {
+        path: (False, "\n".join(lines) + f"\nFound {len(lines)} error(s).")
+        for path, lines in grouped.items()
+    }
+
+
+class RuffServer:
+    """
+    Long-lived ``ruff server`` process spoken to over LSP on stdio.
+
+    Lint requests are sent as document updates and answered with pulled
+    diagnostics, so repeated checks of the same files (as in watch mode) do
+    not pay for a ruff process start each time.
+    """
+
+    def __init__(self, root: Path, timeout: float = 10.0):
+        self.root = root
+        self.timeout = timeout
+        self._process: Optional[subprocess.Popen] = None
+        self._messages: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._write_lock = threading.Lock()
+        self._next_id = 0
+        self._versions: Dict[str, int] = {}
+
+    @property
+    def running(self) -> bool:
+        """Whether the server process is alive."""
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> bool:
+        """Start the server and perform the LSP handshake."""
+        try:
+            self._process = subprocess.Popen(
+                ["ruff", "server"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                cwd=str(self.root),
+            )
+        except FileNotFoundError:
+            console.print("[red]Error: Ruff not found. Please install ruff.[/red]")
+            return False
+
+        threading.Thread(target=self._read_messages, daemon=True).start()
+
+        root_uri = self.root.resolve().as_uri()
+        response = self._request("initialize", {
+            "processId": os.getpid(),
+            "rootUri": root_uri,
+            "workspaceFolders": [{"uri": root_uri, "name": self.root.name}],
+            "capabilities": {"textDocument": {"diagnostic": {"dynamicRegistration": False}}},
+        })
+        if response is None or "error" in response:
+            console.print("[yellow]Warning: ruff server failed to initialize[/yellow]")
+            self.stop()
+            return False
+
+        self._notify("initialized", {})
+        return True
+
+    def stop(self) -> None:
+        """Shut the server down, killing it if it does not exit promptly."""
+        if self._process is None:
+            return
+        if self.running:
+            self._request("shutdown", None)
+            self._notify("exit", None)
+            try:
+                self._process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        self._process = None
+        self._versions.clear()
+
+    def check(self, path: Path, text: Optional[str] = None) -> Optional[LintResult]:
+        """
+        Lint a file through the running server.
+
+        Args:
+            path: File to lint
+            text: File content (read from disk when not given)
+
+        Returns:
+            A ``(passed, output)`` pair, or None if the server could not answer
+        """
+        if not self.running:
+            return None
+        if text is None:
+            text = path.read_text()
+
+        uri = path.resolve().as_uri()
+        version = self._versions.get(uri)
+        if version is None:
+            self._versions[uri] = 1
+            self._notify("textDocument/didOpen", {
+                "textDocument": {"uri": uri, "languageId": "python", "version": 1, "text": text},
+            })
+        else:
+            self._versions[uri] = version + 1
+            self._notify("textDocument/didChange", {
+                "textDocument": {"uri": uri, "version": version + 1},
+                "contentChanges": [{"text": text}],
+            })
+
+        response = self._request("textDocument/diagnostic", {"textDocument": {"uri": uri}})
+        if response is None or "error" in response:
+            return None
+
+        lines = []
+        for diagnostic in (response.get("result") or {}).get("items", []):
+            start = diagnostic.get("range", {}).get("start", {})
+            lines.append(format_diagnostic({
+                "filename": str(path),
+                "code": diagnostic.get("code"),
+                "message": diagnostic.get("message", "").split("\n", 1)[0],
+                "location": {"row": start.get("line", 0) + 1, "column": start.get("character", 0) + 1},
+            }))
+        if not lines:
+            return True, ""
+        return False, "\n".join(lines) + f"\nFound {len(lines)} error(s)."
+
+    def _send(self, message: dict) -> None:
+        """Write one JSON-RPC message to the server."""
+        assert self._process is not None and self._process.stdin is not None
+        body = json.dumps(dict(message, jsonrpc="2.0")).encode("utf-8")
+        with self._write_lock:
+            try:
+                self._process.stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+                self._process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+
+    def _notify(self, method: str, params: Optional[dict]) -> None:
+        """Send a notification (no response expected)."""
+        self._send({"method": method, "params": params})
+
+    def _request(self, method: str, params: Optional[dict]) -> Optional[dict]:
+        """Send a request and wait for its response."""
+        self._next_id += 1
+        request_id = self._next_id
+        self._send({"id": request_id, "method": method, "params": params})
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                message = self._messages.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if message is None:
+                return None
+            if message.get("id") == request_id and "method" not in message:
+                return message
+            if "id" in message and "method" in message:
+                # Server-to-client request (e.g. client/registerCapability)
+                self._send({"id": message["id"], "result": None})
+
+    def _read_messages(self) -> None:
+        """Read framed JSON-RPC messages from the server until it exits."""
+        assert self._process is not None and self._process.stdout is not None
+        stream = self._process.stdout
+        while True:
+            length = None
+            while True:
+                header = stream.readline()
+                if not header:
+                    self._messages.put(None)
+                    return
+                header = header.strip()
+                if not header:
+                    break
+                name, _, value = header.decode("ascii", "replace").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value.strip())
+            if length is None:
+                continue
+            try:
+                self._messages.put(json.loads(stream.read(length)))
+            except json.JSONDecodeError:
+                continue
@@ -0,0 +1,172 @@
+"""
+Exercise pack: the shipped exercises as one compressed archive.
+
+Reading ~60 loose files out of site-packages means a directory walk and a
+file open per exercise, which is slow on a cold cache or a network-mounted
+install. The pack is a single zip file holding the exercise tree plus an
+embedded index: every file's content hash and size, and for exercises the
+manifest entry (title, category, TODO count, limits, imports) that
+``snakers list`` needs. ``snakers init`` reads the index once and then
+extracts members by random access, only the ones that have to be written.
+
+Builds write the pack into the wheel (see ``setup.py``) and mark it as a
+release pack. To rebuild the one in a checkout::
+
+    python -m snakers.pack [SOURCE_DIR] [PACK_FILE]
+
+A checkout's pack whose index doesn't match the loose exercise files next to
+it (say one left behind after editing exercises) is ignored. A release pack
+was built from the files installed alongside it, so they are never scanned.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from rich.console import Console
+
+from .index import ExerciseIndex
+from .sync import copy_stream, file_hash, source_files
+
+console = Console()
+
+PACK_VERSION = 1
+PACK_FILE = "exercises.zip"
+PACK_INDEX = "index.json"
+
+
+def default_pack() -> Optional["ExercisePack"]:
+    """The exercise pack shipped with the package, if there is one."""
+    try:
+        from importlib.resources import files
+        resource = files("snakers") / PACK_FILE
+    except ImportError:
+        # Python 3.8
+        resource = Path(__file__).parent / PACK_FILE
+    if not resource.is_file():
+        return None
+    try:
+        return ExercisePack(resource)
+    except (zipfile.BadZipFile, KeyError, ValueError, OSError) as e:
+        console.print(f"[yellow]Warning: Could not open exercise pack: {e}[/yellow]")
+        return None
+
+
+def build_pack(source_dir: Path, pack_file: Path, release: bool = False) -> int:
+    """
+    Write an exercise pack of a directory's exercise files.
+
+    Args:
+        source_dir: Exercise tree to pack
+        pack_file: Where to write the pack
+        release: Mark the pack as built for a release, whose loose exercise
+            files are installed with it and can't drift from it
+
+    Returns:
+        Number of files packed
+    """
+    keys = sorted(source_files(source_dir))
+    # Manifest entries of the exercises, computed the way the index does
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = ExerciseIndex(source_dir, Path(temp_dir) / "manifest.json")
+        index.refresh()
+        entries = {entry.path.relative_to(source_dir).as_posix(): entry for entry in index.entries}
+
+    files: Dict[str, dict] = {}
+    for key in keys:
+        content = (source_dir / key).read_bytes()
+        files[key] = {"hash": hashlib.sha256(content).hexdigest(), "size": len(content)}
+        if key in entries:
+            files[key]["entry"] = entries[key].to_dict()
+
+    temp_path = pack_file.with_name(pack_file.name + ".tmp")
+    with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+        # Index first, so it is found without reading past the exercises
+        index = {"version": PACK_VERSION, "release": release, "files": files}
+        archive.writestr(PACK_INDEX, json.dumps(index, sort_keys=True))
+        for key in keys:
+            archive.write(source_dir / key, key)
+    os.replace(temp_path, pack_file)
+    return len(keys)
+
+
+class ExercisePack:
+    """Read access to an exercise pack through its embedded index."""
+
+    def __init__(self, pack_file):
+        """
+        Args:
+            pack_file: Path of the pack, or an ``importlib.resources`` traversable
+        """
+        self.pack_file = pack_file
+        if isinstance(pack_file, (str, os.PathLike)):
+            self._zip = zipfile.ZipFile(pack_file)
+        else:
+            self._zip = zipfile.ZipFile(pack_file.open("rb"))
+        index = json.loads(self._zip.read(PACK_INDEX))
+        if index.get("version") != PACK_VERSION:
+            raise ValueError(f"unsupported exercise pack version {index.get('version')}")
+        self.files: Dict[str, dict] = index["files"]
+        self.release: bool = index.get("release", False)
+
+    def keys(self) -> List[str]:
+        """Relative paths of the packed files."""
+        return sorted(self.files)
+
+    def content_hash(self, key: str) -> str:
+        """SHA-256 of a packed file, from the index."""
+        return self.files[key]["hash"]
+
+    def read_bytes(self, key: str) -> bytes:
+        """Content of a packed file."""
+        return self._zip.read(key)
+
+    def copy_to(self, key: str, dest: Path) -> None:
+        """Extract one packed file to ``dest``, replacing it atomically."""
+        with self._zip.open(key) as member:
+            copy_stream(member, dest)
+
+    def matches(self, source_dir: Path) -> bool:
+        """
+        Whether the pack holds the current content of a directory's exercise files.
+
+        Files modified after the pack was written are hashed and compared
+        with the index; older ones are taken to be the packed content. True
+        without looking at the directory for a release pack, and when there
+        are no loose files to compare with.
+        """
+        if self.release or not isinstance(self.pack_file, (str, os.PathLike)):
+            # Installed together with the files it was built from, or inside
+            # a zipped install with nothing to compare against
+            return True
+        keys = sorted(source_files(source_dir))
+        if not keys:
+            return True
+        if keys != self.keys():
+            return False
+        built = os.stat(self.pack_file).st_mtime_ns
+        for key in keys:
+            path = source_dir / key
+            if path.stat().st_mtime_ns > built and file_hash(path) != self.content_hash(key):
+                return False
+        return True
+
+    def manifest_entries(self) -> Dict[str, dict]:
+        """Stored manifest entries of the packed exercises and helper modules."""
+        return {key: data["entry"] for key, data in self.files.items() if "entry" in data}
+
+    def close(self) -> None:
+        """Close the archive."""
+        self._zip.close()
+
+
+if __name__ == "__main__":
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / "exercises"
+    target = Path(sys.argv[2]) if len(sys.argv) > 2 else Path(__file__).parent / PACK_FILE
+    count = build_pack(source, target)
+    console.print(f"[green]Packed {count} files into {target}[/green]")
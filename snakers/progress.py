@@ -0,0 +1,291 @@
+"""
+SQLite-backed progress tracking.
+
+Each (learner, exercise) pair has its own row, so recording an attempt is a
+single-row upsert instead of rewriting the whole progress file, and several
+snakers processes (say a watch session and a ``snakers run`` in another
+terminal, or a whole cohort on a shared host) can update progress at the
+same time without losing each other's writes.
+"""
+
+import getpass
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from rich.console import Console
+
+from .execution import RunUsage
+
+console = Console()
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress (
+    learner TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'todo',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    first_attempt_at REAL,
+    last_attempt_at REAL,
+    completed_at REAL,
+    last_verdict TEXT,
+    last_failure TEXT,
+    usage TEXT,
+    PRIMARY KEY (learner, exercise)
+);
+CREATE INDEX IF NOT EXISTS progress_learner_status ON progress (learner, status);
+CREATE INDEX IF NOT EXISTS progress_exercise_status ON progress (exercise, status);
+"""
+
+
+def default_learner() -> str:
+    """Learner id from ``SNAKERS_LEARNER``, falling back to the login name."""
+    learner = os.environ.get("SNAKERS_LEARNER")
+    if learner:
+        return learner
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "default"
+
+
+def default_db_file() -> Path:
+    """Progress database from ``SNAKERS_PROGRESS_DB``, or one in the home directory."""
+    db_file = os.environ.get("SNAKERS_PROGRESS_DB")
+    if db_file:
+        return Path(db_file).expanduser()
+    return Path.home() / ".snakers_progress.db"
+
+
+def _prefix_range(prefix: str):
+    """Bounds matching every path under a directory prefix, usable by an index."""
+    prefix = prefix.rstrip("/") + "/"
+    # "0" is the character right after "/"
+    return prefix, prefix[:-1] + "0"
+
+
+def _exercise_condition(prefix: str):
+    """SQL condition and parameters matching one exercise file or a directory of them."""
+    if prefix.endswith(".py"):
+        return "exercise = ?", (prefix,)
+    return "exercise >= ? AND exercise < ?", _prefix_range(prefix)
+
+
+class ProgressStore:
+    """Per-learner, per-exercise progress rows in a WAL-mode SQLite database."""
+
+    def __init__(self, db_file: Path, learner: str, legacy_file: Optional[Path] = None):
+        self.db_file = db_file
+        self.learner = learner
+        self._lock = threading.Lock()
+        # Shared between the main thread and watch mode's observer thread
+        self._db = sqlite3.connect(str(db_file), timeout=10, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._upgrade_schema()
+        if legacy_file is not None:
+            self._migrate_json(legacy_file)
+
+    def _upgrade_schema(self) -> None:
+        """Create the schema, moving single-learner rows over to this learner."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            version = self._db.execute("PRAGMA user_version").fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                return
+            columns = {row["name"] for row in self._db.execute("PRAGMA table_info(progress)")}
+            if columns and "learner" not in columns:
+                self._db.execute("DROP INDEX IF EXISTS progress_status")
+                self._db.execute("ALTER TABLE progress RENAME TO progress_v1")
+                self._create_tables()
+                self._db.execute(
+                    "INSERT INTO progress SELECT ?, exercise, status, attempts, first_attempt_at, "
+                    "last_attempt_at, completed_at, last_verdict, last_failure, usage FROM progress_v1",
+                    (self.learner,),
+                )
+                self._db.execute("DROP TABLE progress_v1")
+            else:
+                self._create_tables()
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _create_tables(self) -> None:
+        """Run the schema statements inside the current transaction."""
+        # executescript() would commit the open transaction first
+        for statement in SCHEMA.split(";"):
+            if statement.strip():
+                self._db.execute(statement)
+
+    def _migrate_json(self, legacy_file: Path) -> None:
+        """Import a ``.snakers_progress.json`` file once, then set it aside."""
+        if not legacy_file.exists():
+            return
+        try:
+            with open(legacy_file) as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            console.print("[yellow]Warning: Could not load progress file for migration[/yellow]")
+            return
+
+        stats = legacy.get("stats", {})
+        now = time.time()
+        with self._lock, self._db:
+            for exercise in legacy.get("completed", []):
+                self._db.execute(
+                    "INSERT OR IGNORE INTO progress (learner, exercise, status, completed_at, last_verdict, usage) "
+                    "VALUES (?, ?, 'done', ?, 'passed', ?)",
+                    (self.learner, exercise, now, json.dumps(stats[exercise]) if exercise in stats else None),
+                )
+            for exercise, usage in stats.items():
+                self._db.execute(
+                    "INSERT OR IGNORE INTO progress (learner, exercise, usage) VALUES (?, ?, ?)",
+                    (self.learner, exercise, json.dumps(usage)),
+                )
+        try:
+            legacy_file.rename(legacy_file.with_name(legacy_file.name + ".migrated"))
+        except OSError:
+            # Another snakers process migrated it first
+            return
+        console.print(f"[blue]Migrated progress from {legacy_file} to {self.db_file}[/blue]")
+
+    def completed(self) -> Set[str]:
+        """Relative paths of the exercises this learner has completed."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT exercise FROM progress WHERE learner = ? AND status = 'done'", (self.learner,)
+            ).fetchall()
+        return {row["exercise"] for row in rows}
+
+    def entries(self) -> Dict[str, sqlite3.Row]:
+        """This learner's progress rows, keyed by exercise relative path."""
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM progress WHERE learner = ?", (self.learner,)).fetchall()
+        return {row["exercise"]: row for row in rows}
+
+    def record_attempt(
+        self,
+        exercise: str,
+        passed: bool,
+        failure: str = "",
+        usage: Optional[RunUsage] = None,
+    ) -> bool:
+        """
+        Record one check of an exercise by this learner.
+
+        Args:
+            exercise: Exercise relative path
+            passed: Whether the check passed
+            failure: Failure report of a failed check
+            usage: Resource usage of the run, if the file was run
+
+        Returns:
+            True if this attempt completed the exercise for the first time
+        """
+        now = time.time()
+        with self._lock, self._db:
+            # Take the write lock up front so the read below can't race
+            # another process's update
+            self._db.execute("BEGIN IMMEDIATE")
+            was_completed = self._db.execute(
+                "SELECT 1 FROM progress WHERE learner = ? AND exercise = ? AND status = 'done'",
+                (self.learner, exercise),
+            ).fetchone() is not None
+            self._db.execute(
+                """
+                INSERT INTO progress (
+                    learner, exercise, status, attempts, first_attempt_at, last_attempt_at,
+                    completed_at, last_verdict, last_failure, usage
+                ) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (learner, exercise) DO UPDATE SET
+                    status = CASE WHEN progress.status = 'done' THEN 'done' ELSE excluded.status END,
+                    attempts = progress.attempts + 1,
+                    first_attempt_at = COALESCE(progress.first_attempt_at, excluded.first_attempt_at),
+                    last_attempt_at = excluded.last_attempt_at,
+                    completed_at = COALESCE(progress.completed_at, excluded.completed_at),
+                    last_verdict = excluded.last_verdict,
+                    last_failure = excluded.last_failure,
+                    usage = COALESCE(excluded.usage, progress.usage)
+                """,
+                (
+                    self.learner,
+                    exercise,
+                    "done" if passed else "attempted",
+                    now,
+                    now,
+                    now if passed else None,
+                    "passed" if passed else "failed",
+                    failure or None,
+                    json.dumps(usage.to_dict()) if usage is not None else None,
+                ),
+            )
+        return passed and not was_completed
+
+    def record_usage(self, exercise: str, usage: RunUsage) -> None:
+        """
+        Store a run's resource usage without counting it as an attempt.
+
+        Used by verification runs (``check-all``, ``list --verify``), which
+        must not change attempts, status or the last failure.
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO progress (learner, exercise, usage) VALUES (?, ?, ?) "
+                "ON CONFLICT (learner, exercise) DO UPDATE SET usage = excluded.usage",
+                (self.learner, exercise, json.dumps(usage.to_dict())),
+            )
+
+    def reset(self) -> None:
+        """Forget this learner's progress."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM progress WHERE learner = ?", (self.learner,))
+
+    def cohort_summary(self, prefix: Optional[str] = None) -> List[sqlite3.Row]:
+        """
+        Per-exercise totals across every learner.
+
+        Args:
+            prefix: Only include exercises under this directory (e.g.
+                ``12_concurrency``), or this one exercise file
+
+        Returns:
+            Rows of exercise, learners done, learners stuck (attempted but
+            not done) and total attempts, ordered by exercise
+        """
+        query = (
+            "SELECT exercise, "
+            "SUM(status = 'done') AS done, "
+            "SUM(status = 'attempted') AS stuck, "
+            "SUM(attempts) AS attempts "
+            "FROM progress"
+        )
+        params: tuple = ()
+        if prefix:
+            condition, params = _exercise_condition(prefix)
+            query += f" WHERE {condition}"
+        query += " GROUP BY exercise ORDER BY exercise"
+        with self._lock:
+            return self._db.execute(query, params).fetchall()
+
+    def stuck(self, prefix: str) -> List[sqlite3.Row]:
+        """
+        Learners who attempted but have not completed exercises under a prefix.
+
+        Args:
+            prefix: Exercise directory (e.g. ``12_concurrency``) or relative path
+
+        Returns:
+            Progress rows, most attempts first
+        """
+        condition, params = _exercise_condition(prefix)
+        with self._lock:
+            return self._db.execute(
+                f"SELECT * FROM progress WHERE {condition} AND status = 'attempted' "
+                "ORDER BY attempts DESC, learner",
+                params,
+            ).fetchall()
@@ -0,0 +1,184 @@
+"""
+Cached syntax-highlighted rendering of exercise and solution sources.
+
+Highlighting a source with ``rich.syntax.Syntax`` means importing Pygments
+and lexing the whole file, which is slow for the longer exercises and is
+repeated every time ``run`` or watch mode shows an unchanged file. The
+rendered lines are cached instead, keyed by content hash, theme and width,
+in memory and as small JSON files on disk, so re-displaying a file skips
+both the Pygments import and the lexing.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from rich.console import Console, ConsoleOptions, RenderResult
+from rich.segment import Segment
+from rich.style import Style
+
+# Bumped when the stored format (or what goes into a render) changes
+RENDER_VERSION = "1"
+
+Lines = List[List[Segment]]
+
+
+class RenderedLines:
+    """Pre-rendered lines of segments, printable like any rich renderable."""
+
+    def __init__(self, lines: Lines):
+        self.lines = lines
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        new_line = Segment.line()
+        for line in self.lines:
+            yield from line
+            yield new_line
+
+
+class RenderCache:
+    """
+    LRU cache of highlighted sources, in memory and on disk.
+
+    Each rendering is stored as ``<key>.json`` in the cache directory; the
+    least recently used files beyond ``max_entries`` are deleted.
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int = 200, memory_entries: int = 32):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Lines]" = OrderedDict()
+
+    def make_key(self, content: str, theme: str, width: int, line_numbers: bool) -> str:
+        """Build the cache key for a rendering."""
+        digest = hashlib.sha256()
+        for part in (
+            RENDER_VERSION,
+            _rich_version(),
+            hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            theme,
+            str(width),
+            str(line_numbers),
+        ):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def syntax(
+        self,
+        console: Console,
+        content: str,
+        theme: str = "monokai",
+        line_numbers: bool = True,
+    ) -> RenderedLines:
+        """
+        Highlighted Python source, rendered for the console's current width.
+
+        Args:
+            console: Console the result will be printed on
+            content: Source to highlight
+            theme: Pygments theme
+            line_numbers: Whether to number the lines
+        """
+        width = console.width
+        key = self.make_key(content, theme, width, line_numbers)
+        lines = self._get(key)
+        if lines is None:
+            from rich.syntax import Syntax
+            syntax = Syntax(content, "python", theme=theme, line_numbers=line_numbers)
+            lines = console.render_lines(syntax, console.options.update_width(width), new_lines=False)
+            self._put(key, lines)
+        return RenderedLines(lines)
+
+    def _get(self, key: str) -> Optional[Lines]:
+        """Look a rendering up in memory, then on disk."""
+        with self._lock:
+            lines = self._memory.get(key)
+            if lines is not None:
+                self._memory.move_to_end(key)
+                return lines
+
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+            lines = [
+                [Segment(text, Style.parse(style) if style else None) for text, style in line]
+                for line in stored
+            ]
+            # Mark it recently used for eviction
+            os.utime(path)
+        except (OSError, ValueError, TypeError):
+            return None
+        self._remember(key, lines)
+        return lines
+
+    def _put(self, key: str, lines: Lines) -> None:
+        """Store a rendering in memory and on disk, evicting old ones."""
+        self._remember(key, lines)
+        stored = [[[segment.text, str(segment.style) if segment.style else None] for segment in line] for line in lines]
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_dir / f"{key}.json.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(stored, f)
+            # Atomic, so a concurrent snakers process never reads half a file
+            os.replace(temp_path, self.cache_dir / f"{key}.json")
+        except OSError:
+            return
+        self._evict()
+
+    def _remember(self, key: str, lines: Lines) -> None:
+        """Keep a rendering in the in-memory LRU."""
+        with self._lock:
+            self._memory[key] = lines
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        """Delete the least recently used files beyond the cap."""
+        entries = list(self._entries())
+        if len(entries) <= self.max_entries:
+            return
+        by_age = []
+        for path in entries:
+            try:
+                by_age.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        by_age.sort()
+        for _, path in by_age[: len(by_age) - self.max_entries]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _entries(self) -> Iterable[Path]:
+        """Rendering files in the cache directory."""
+        try:
+            with os.scandir(self.cache_dir) as it:
+                return [Path(entry.path) for entry in it if entry.name.endswith(".json")]
+        except OSError:
+            return []
+
+
+_version: Optional[str] = None
+
+
+def _rich_version() -> str:
+    """Installed rich version (its rendering may change between releases)."""
+    global _version
+    if _version is None:
+        try:
+            from importlib.metadata import version
+            _version = version("rich")
+        except Exception:
+            _version = "unknown"
+    return _version
@@ -1,60 +1,256 @@
 """
 Exercise runner and progress tracking.
+
+Rendering (rich tables, syntax highlighting), concurrency and file watching
+are imported by the commands that use them, so commands like ``list`` or
+``--version`` don't pay for Pygments, asyncio or watchdog at startup.
 """
 
+import io
 import json
-import subprocess
-import sys
-import shutil
+import os
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.syntax import Syntax
-from rich.table import Table
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 
-from .exercise import Exercise
+from .cache import VerdictCache
+from .exercise import Exercise, Snapshot
+from .execution import DEFAULT_OUTPUT_LIMIT, ForkServerBackend, RunUsage
+from .index import ExerciseIndex
+from .linting import LintResult, RuffServer, run_ruff_batch
+from .history import SolutionHistory, default_history_dir
+from .progress import ProgressStore, default_db_file, default_learner
+from .render import RenderCache
 
 console = Console()
 
 class ExerciseRunner:
     """Manages exercise execution and progress tracking."""
     
-    def __init__(self, exercise_dir: Path):
+    def __init__(
+        self,
+        exercise_dir: Path,
+        backend: str = "subprocess",
+        output_limit: int = DEFAULT_OUTPUT_LIMIT,
+        learner: Optional[str] = None,
+        progress_db: Optional[Path] = None,
+    ):
         self.exercise_dir = exercise_dir
-        self.progress_file = Path.home() / ".snakers_progress.json"
-        self.progress = self.load_progress()
+        self.backend = self._create_backend(backend)
+        self.output_limit = output_limit
+        self.progress = ProgressStore(
+            progress_db or default_db_file(),
+            learner or default_learner(),
+            legacy_file=Path.home() / ".snakers_progress.json",
+        )
+        self.cache = VerdictCache(Path.home() / ".snakers_cache.json")
+        self.index = ExerciseIndex(exercise_dir)
+        self.render_cache = RenderCache(Path.home() / ".snakers_render_cache")
+        # Solutions used to be saved here, one copy per exercise
         self.solutions_dir = Path(__file__).parent / "solutions"
-        
-        # Ensure solutions directory exists
-        self.solutions_dir.mkdir(exist_ok=True)
-    
-    def load_progress(self) -> dict:
-        """Load progress from file."""
-        if self.progress_file.exists():
-            try:
-                with open(self.progress_file) as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                console.print("[yellow]Warning: Could not load progress file[/yellow]")
-        return {"completed": [], "version": "0.1.0"}
-    
-    def save_progress(self):
-        """Save progress to file."""
-        try:
-            with open(self.progress_file, "w") as f:
-                json.dump(self.progress, f, indent=2)
-        except IOError as e:
-            console.print(f"[yellow]Warning: Could not save progress: {e}[/yellow]")
+        self.history = SolutionHistory(
+            default_history_dir(), self.progress.learner, legacy_dir=self.solutions_dir
+        )
+    
+    def _create_backend(self, backend: str) -> Optional[ForkServerBackend]:
+        """Create the execution backend exercises are run with."""
+        if backend == "forkserver":
+            if ForkServerBackend.is_available():
+                pool = ForkServerBackend()
+                pool.start()
+                return pool
+            console.print("[yellow]Warning: forkserver backend is not available on this platform[/yellow]")
+        return None
+    
+    def _make_exercise(self, path: Path) -> Exercise:
+        """Create an exercise wired to this runner's execution backend."""
+        exercise = Exercise(path)
+        exercise.backend = self.backend
+        exercise.output_limit = self.output_limit
+        exercise.dependency_hash = self.index.dependency_hash(path)
+        return exercise
+    
+    def _record_attempt(self, exercise: Exercise, passed: bool) -> bool:
+        """Store a check's verdict and run usage; True if newly completed."""
+        return self.progress.record_attempt(
+            exercise.relative_path, passed, exercise.failure, exercise.usage
+        )
+    
+    def _record_usage(self, exercise: Exercise) -> None:
+        """Store the resource usage of a verification run, if the file was run."""
+        if exercise.usage is not None:
+            self.progress.record_usage(exercise.relative_path, exercise.usage)
     
     def get_exercises(self) -> List[Exercise]:
         """Get all exercise files sorted by path."""
-        exercise_files = sorted(self.exercise_dir.glob("**/*.py"))
-        return [Exercise(path) for path in exercise_files]
+        return [self._make_exercise(entry.path) for entry in self.index.refresh()]
+    
+    def _next_incomplete(self, exercises: Optional[List[Exercise]] = None) -> Optional[Exercise]:
+        """The first exercise not completed yet, if any."""
+        completed = self.progress.completed()
+        for ex in exercises if exercises is not None else self.get_exercises():
+            if ex.relative_path not in completed:
+                return ex
+        return None
+    
+    def find_exercise(self, name: str) -> Optional[Exercise]:
+        """Find an exercise by name or relative path."""
+        self.index.refresh()
+        entry = self.index.find(name)
+        return self._make_exercise(entry.path) if entry else None
+    
+    def check_all(
+        self,
+        exercises: Optional[List[Exercise]] = None,
+        workers: Optional[int] = None,
+    ) -> Dict[str, bool]:
+        """
+        Check every exercise, running ruff once over the whole tree.
+
+        Exercises are checked concurrently on a bounded worker pool; each
+        worker's report is buffered and printed in exercise order. Only the
+        runs' resource usage is stored: verifying is not an attempt, so
+        attempts, status and last failures are left alone.
+
+        Args:
+            exercises: Exercises to check (default: all exercises)
+            workers: Maximum number of exercises checked at once
+                (default: CPU count)
+
+        Returns:
+            Mapping of exercise relative path to whether it passed
+        """
+        if exercises is None:
+            exercises = self.get_exercises()
+        workers = max(1, workers or os.cpu_count() or 1)
+        lint_results = self._batch_lint(exercises)
+
+        def check_one(ex: Exercise) -> Tuple[bool, str]:
+            buffer = self._buffer_output(ex)
+            passed = ex.check(ruff_result=self._lint_result_for(ex, lint_results), cache=self.cache)
+            return passed, buffer.getvalue()
+
+        from concurrent.futures import ThreadPoolExecutor
+        
+        results = {}
+        # One cache write for the whole run
+        with self.cache.batch(), ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(ex, pool.submit(check_one, ex)) for ex in exercises]
+            for ex, future in futures:
+                passed, output = future.result()
+                console.file.write(output)
+                console.file.flush()
+                results[ex.relative_path] = passed
+        for ex in exercises:
+            self._record_usage(ex)
+        return results
+    
+    async def check_all_async(
+        self,
+        exercises: Optional[List[Exercise]] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, bool]:
+        """
+        Check every exercise from a single event loop.
+
+        Same contract as ``check_all``, but driven by ``Exercise.check_async``
+        with at most ``limit`` checks in flight.
+        """
+        if exercises is None:
+            exercises = self.get_exercises()
+        limit = max(1, limit or os.cpu_count() or 1)
+        import asyncio
+        
+        lint_results = self._batch_lint(exercises)
+        semaphore = asyncio.Semaphore(limit)
+
+        async def check_one(ex: Exercise) -> Tuple[bool, str]:
+            async with semaphore:
+                buffer = self._buffer_output(ex)
+                passed = await ex.check_async(
+                    ruff_result=self._lint_result_for(ex, lint_results), cache=self.cache
+                )
+                return passed, buffer.getvalue()
+
+        results = {}
+        with self.cache.batch():
+            tasks = [(ex, asyncio.ensure_future(check_one(ex))) for ex in exercises]
+            for ex, task in tasks:
+                passed, output = await task
+                console.file.write(output)
+                console.file.flush()
+                results[ex.relative_path] = passed
+        for ex in exercises:
+            self._record_usage(ex)
+        return results
+    
+    def _batch_lint(self, exercises: List[Exercise]) -> Optional[Dict[Path, LintResult]]:
+        """Lint the whole tree once, unless every exercise has a cached verdict."""
+        if all(ex.is_cached(self.cache) for ex in exercises):
+            return None
+        return run_ruff_batch(self.exercise_dir)
+    
+    @staticmethod
+    def _lint_result_for(
+        ex: Exercise, lint_results: Optional[Dict[Path, LintResult]]
+    ) -> Optional[LintResult]:
+        """Pick an exercise's verdict out of a batch lint (None: lint it alone)."""
+        if lint_results is None:
+            return None
+        return lint_results.get(ex.path.resolve(), (True, ""))
+    
+    @staticmethod
+    def _buffer_output(ex: Exercise) -> io.StringIO:
+        """Redirect an exercise's report into a buffer styled like the console."""
+        buffer = io.StringIO()
+        ex.console = Console(
+            file=buffer,
+            force_terminal=console.is_terminal,
+            color_system=console.color_system,
+            width=console.width,
+        )
+        return buffer
+    
+    def check_all_exercises(self, workers: Optional[int] = None, use_async: bool = False):
+        """
+        Verify every exercise in parallel and summarise the results.
+
+        Args:
+            workers: Maximum number of exercises checked at once
+            use_async: Drive the checks from one asyncio event loop instead
+                of a thread pool
+        """
+        exercises = self.get_exercises()
+        if not exercises:
+            console.print("[yellow]No exercises found in the exercises directory.[/yellow]")
+            return
+        
+        from rich.table import Table
+        
+        start = time.perf_counter()
+        if use_async:
+            import asyncio
+            results = asyncio.run(self.check_all_async(exercises, limit=workers))
+        else:
+            results = self.check_all(exercises, workers=workers)
+        elapsed = time.perf_counter() - start
+        
+        failed = [path for path, passed in results.items() if not passed]
+        passed_count = len(results) - len(failed)
+        
+        table = Table(title="Check Summary")
+        table.add_column("Passed", style="green")
+        table.add_column("Failed", style="red")
+        table.add_column("Wall time", style="cyan")
+        table.add_row(str(passed_count), str(len(failed)), f"{elapsed:.2f}s")
+        console.print(table)
+        
+        if failed:
+            console.print("[red]Failed exercises:[/red]")
+            for path in failed:
+                console.print(f"  - {path}")
     
     def run_exercise(self, exercise_name: Optional[str] = None):
         """Run a specific exercise or the next incomplete one."""
@@ -66,11 +262,7 @@ class ExerciseRunner:
         
         if exercise_name:
             # Find specific exercise
-            target_exercise = None
-            for ex in exercises:
-                if ex.name == exercise_name or ex.path.stem == exercise_name:
-                    target_exercise = ex
-                    break
+            target_exercise = self.find_exercise(exercise_name)
             
             if not target_exercise:
                 console.print(f"[red]Exercise '{exercise_name}' not found[/red]")
@@ -78,52 +270,78 @@ class ExerciseRunner:
                 return
         else:
             # Find next incomplete exercise
-            completed = set(self.progress["completed"])
-            target_exercise = None
-            for ex in exercises:
-                if ex.relative_path not in completed:
-                    target_exercise = ex
-                    break
+            target_exercise = self._next_incomplete(exercises)
             
             if not target_exercise:
                 console.print("[green]🎉 Congratulations! All exercises completed![/green]")
                 return
         
-        self._display_exercise(target_exercise)
+        # One read serves the display and the whole check
+        snapshot = target_exercise.take_snapshot()
+        self._display_exercise(target_exercise, snapshot)
         
-        if target_exercise.check():
-            if target_exercise.relative_path not in self.progress["completed"]:
-                self.progress["completed"].append(target_exercise.relative_path)
-                self.save_progress()
-                console.print(f"[green]✅ Exercise '{target_exercise.name}' completed![/green]")
+        passed = target_exercise.check(cache=self.cache, snapshot=snapshot)
+        if self._record_attempt(target_exercise, passed):
+            console.print(f"[green]✅ Exercise '{target_exercise.name}' completed![/green]")
     
-    def _display_exercise(self, exercise: Exercise):
-        """Display exercise content and information."""
-        console.print(Panel(
+    def _display_exercise(self, exercise: Exercise, snapshot: Optional[Snapshot] = None):
+        """Display exercise content (a snapshot's, if given) and information."""
+        from rich.panel import Panel
+        
+        info = (
             f"[bold]Exercise:[/bold] {exercise.name}\n"
-            f"[bold]File:[/bold] {exercise.relative_path}",
-            title="Current Exercise",
-            border_style="blue"
-        ))
+            f"[bold]File:[/bold] {exercise.relative_path}"
+        )
+        entry = self.index.entry_for(exercise.path)
+        if entry is not None:
+            info = f"[bold]{entry.title}[/bold]\n" + info
+            info += f"\n[bold]TODOs:[/bold] {entry.todo_count}"
+            if entry.limits:
+                limits = ", ".join(f"{key}={value}" for key, value in entry.limits.items())
+                info += f"\n[bold]Limits:[/bold] {limits}"
+        console.print(Panel(info, title="Current Exercise", border_style="blue"))
         
         # Show exercise content
-        content = exercise.get_content()
-        syntax = Syntax(content, "python", theme="monokai", line_numbers=True)
-        console.print(syntax)
+        content = snapshot.text if snapshot is not None else exercise.get_content()
+        console.print(self.render_cache.syntax(console, content))
     
-    def list_exercises(self):
-        """List all exercises with completion status."""
+    def list_exercises(self, verify: bool = False):
+        """
+        List all exercises with completion status.
+
+        Args:
+            verify: Re-check every exercise and show the verified status
+                instead of the recorded progress
+        """
+        from rich.table import Table
+        
         exercises = self.get_exercises()
-        completed = set(self.progress["completed"])
+        if verify:
+            results = self.check_all(exercises)
+            completed = {path for path, passed in results.items() if passed}
+        else:
+            completed = self.progress.completed()
+        
+        entries = self.progress.entries()
         
         table = Table(title="Snakers Exercises")
         table.add_column("Status", style="green", width=8)
         table.add_column("Exercise", style="cyan")
         table.add_column("File", style="dim")
+        table.add_column("TODOs", justify="right")
+        table.add_column("Attempts", justify="right")
+        table.add_column("Wall", justify="right")
+        table.add_column("CPU", justify="right")
+        table.add_column("Peak RSS", justify="right")
         
         for ex in exercises:
             status = "✅ Done" if ex.relative_path in completed else "⭕ TODO"
-            table.add_row(status, ex.name, str(ex.relative_path))
+            entry = entries.get(ex.relative_path)
+            attempts = str(entry["attempts"]) if entry else "0"
+            usage = json.loads(entry["usage"]) if entry and entry["usage"] else None
+            index_entry = self.index.entry_for(ex.path)
+            todos = str(index_entry.todo_count) if index_entry else "-"
+            table.add_row(status, ex.name, str(ex.relative_path), todos, attempts, *self._usage_columns(usage))
         
         console.print(table)
         
@@ -131,56 +349,195 @@ class ExerciseRunner:
         total_count = len(exercises)
         console.print(f"\nProgress: {completed_count}/{total_count} exercises completed")
     
+    @staticmethod
+    def _usage_columns(data: Optional[dict]) -> Tuple[str, str, str]:
+        """Format stored run usage as wall, CPU and peak RSS table cells."""
+        if not data:
+            return "-", "-", "-"
+        usage = RunUsage.from_dict(data)
+        cpu = "-" if usage.cpu is None else f"{usage.cpu:.2f}s"
+        rss = "-" if usage.max_rss_kb is None else f"{usage.max_rss_kb / 1024:.1f} MB"
+        return f"{usage.wall:.2f}s", cpu, rss
+    
+    def cohort_report(self, exercise: Optional[str] = None):
+        """
+        Show progress across every learner in the progress database.
+
+        Args:
+            exercise: Exercise directory (e.g. ``12_concurrency``) or relative
+                path; also lists the learners stuck on it
+        """
+        from rich.table import Table
+        
+        summary = self.progress.cohort_summary(exercise)
+        if not summary:
+            console.print("[yellow]No progress recorded yet.[/yellow]")
+            return
+        
+        table = Table(title="Cohort Progress")
+        table.add_column("Exercise", style="cyan")
+        table.add_column("Done", justify="right", style="green")
+        table.add_column("Stuck", justify="right", style="red")
+        table.add_column("Attempts", justify="right")
+        for row in summary:
+            table.add_row(row["exercise"], str(row["done"]), str(row["stuck"]), str(row["attempts"]))
+        console.print(table)
+        
+        if not exercise:
+            return
+        
+        stuck = self.progress.stuck(exercise)
+        if not stuck:
+            console.print(f"\n[green]Nobody is stuck on {exercise}[/green]")
+            return
+        
+        table = Table(title=f"Stuck on {exercise}")
+        table.add_column("Learner", style="cyan")
+        table.add_column("Exercise", style="dim")
+        table.add_column("Attempts", justify="right")
+        table.add_column("Last attempt")
+        table.add_column("Last failure", style="red")
+        for row in stuck:
+            last_attempt = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["last_attempt_at"]))
+            failure = (row["last_failure"] or "").strip().splitlines()
+            table.add_row(
+                row["learner"], row["exercise"], str(row["attempts"]), last_attempt,
+                failure[0] if failure else "",
+            )
+        console.print(table)
+    
     def reset_progress(self):
-        """Reset all progress."""
-        self.progress = {"completed": [], "version": "0.1.0"}
-        self.save_progress()
+        """Reset all progress and forget cached verdicts."""
+        self.progress.reset()
+        # Otherwise a stale verdict would be replayed until the file is edited
+        self.cache.clear()
         console.print("[yellow]📝 Progress reset! Starting fresh.[/yellow]")
     
-    def watch_mode(self, exercise_name: Optional[str] = None):
-        """Watch for file changes and auto-check exercises."""
+    def watch_mode(self, exercise_name: Optional[str] = None, poll: Optional[bool] = None):
+        """
+        Watch the current exercise for changes and auto-check it.
+
+        Args:
+            exercise_name: Exercise to watch (default: the next incomplete one)
+            poll: Poll file stats instead of relying on change events
+                (default: only on filesystems that don't deliver events)
+        """
+        from watchdog.observers import Observer
+        
+        from .watch import CheckScheduler, PollingWatch, ScopedWatch, needs_polling
+        
+        if exercise_name:
+            current = self.find_exercise(exercise_name)
+            if current is None:
+                console.print(f"[red]Exercise '{exercise_name}' not found[/red]")
+                return
+        else:
+            current = self._next_incomplete()
+            if current is None:
+                console.print("[green]🎉 Congratulations! All exercises completed![/green]")
+                return
+        
         console.print("[blue]👀 Watching for changes... (Ctrl+C to exit)[/blue]")
         
-        class ChangeHandler(FileSystemEventHandler):
-            def __init__(self, runner):
-                self.runner = runner
+        # Keep one ruff language server alive for the session instead of
+        # spawning `ruff check` on every save
+        ruff_server = RuffServer(self.exercise_dir)
+        if not ruff_server.start():
+            console.print("[yellow]Falling back to running ruff per check[/yellow]")
+        
+        def plan_checks(file_path: Path) -> List[Exercise]:
+            # The changed file (unless it's a helper module) and every
+            # exercise importing it, dependencies first
+            self.index.refresh()
+            entries = self.index.affected_by(file_path)
+            console.print(f"\n[cyan]🔄 File changed: {file_path.stem}[/cyan]")
+            importers = [entry.name for entry in entries if entry.path != file_path]
+            if importers:
+                console.print(f"[cyan]Re-checking exercises that import it: {', '.join(importers)}[/cyan]")
+            exercises = []
+            for entry in entries:
+                exercise = self._make_exercise(entry.path)
+                exercise.live_output = True
+                exercises.append(exercise)
+            return exercises
+        
+        def run_check(exercise: Exercise) -> None:
+            nonlocal current
+            # Ruff and the run see the same bytes, even if the file is saved
+            # again mid-check
+            snapshot = exercise.take_snapshot()
+            passed = exercise.check(
+                ruff_result=ruff_server.check(exercise.path, snapshot.text),
+                cache=self.cache,
+                snapshot=snapshot,
+            )
+            if exercise.cancelled:
+                console.print(f"[dim]{exercise.name} changed again, re-checking the newer version[/dim]")
+                return
+            newly_completed = self._record_attempt(exercise, passed)
+            if passed:
+                # Save solution when exercise is completed
+                self._save_solution(exercise)
+                
+                if newly_completed:
+                    console.print(f"[green]✅ {exercise.name} passed and solution saved![/green]")
+                else:
+                    console.print(f"[green]✅ {exercise.name} passed![/green]")
             
-            def on_modified(self, event):
-                if str(event.src_path).endswith('.py') and not event.is_directory:
-                    file_path = Path(str(event.src_path))
-                    if file_path.is_relative_to(self.runner.exercise_dir):
-                        exercise = Exercise(file_path)
-                        console.print(f"\n[cyan]🔄 File changed: {exercise.name}[/cyan]")
-                        if exercise.check():
-                            # Save solution when exercise is completed
-                            self.runner._save_solution(exercise)
-                            
-                            # Update progress tracking
-                            if exercise.relative_path not in self.runner.progress["completed"]:
-                                self.runner.progress["completed"].append(exercise.relative_path)
-                                self.runner.save_progress()
-                                console.print(f"[green]✅ {exercise.name} passed and solution saved![/green]")
-                            else:
-                                console.print(f"[green]✅ {exercise.name} passed![/green]")
-        
-        event_handler = ChangeHandler(self)
-        observer = Observer()
-        observer.schedule(event_handler, str(self.exercise_dir), recursive=True)
-        observer.start()
+            if passed and current is not None and exercise.path == current.path:
+                # Move the watch on to the next exercise
+                current = self._next_incomplete()
+                if current is None:
+                    console.print("[green]🎉 Congratulations! All exercises completed![/green]")
+                    scope.watch(())
+                    return
+                self._display_exercise(current)
+            if current is not None:
+                # The exercise's imports may have changed
+                scope.watch(self._watched_files(current))
+        
+        # Coalesce bursts of events per file and check on one worker thread,
+        # off the watchdog thread
+        scheduler = CheckScheduler(plan_checks, run_check)
+        if poll is None and needs_polling(self.exercise_dir):
+            console.print("[dim]File change events are not delivered on this filesystem, polling instead[/dim]")
+            poll = True
+        if poll:
+            scope = PollingWatch(scheduler.submit)
+        else:
+            scope = ScopedWatch(Observer(), scheduler.submit)
+        scope.watch(self._watched_files(current))
+        scheduler.start()
+        scope.start()
         
         try:
-            # Show initial exercise if none specified
-            if not exercise_name:
+            # Show the exercise being watched, checking it right away unless
+            # it was picked explicitly
+            if exercise_name:
+                self._display_exercise(current)
+            else:
                 self.run_exercise()
-            observer.join()
+            scope.join()
         except KeyboardInterrupt:
-            observer.stop()
+            scope.stop()
             console.print("\n[yellow]👋 Stopped watching[/yellow]")
+        finally:
+            scheduler.stop()
+            ruff_server.stop()
+    
+    def _watched_files(self, exercise: Exercise) -> List[Path]:
+        """An exercise's file plus the local modules it imports."""
+        self.index.refresh()
+        key = exercise.path.relative_to(self.exercise_dir).as_posix()
+        dependencies = self.index.import_graph().dependencies(key)
+        return [exercise.path] + [self.exercise_dir / dependency for dependency in dependencies]
     
     # Add methods for solutions management
     def list_solutions(self) -> None:
         """List all saved solutions."""
-        solutions = list(self.solutions_dir.glob("**/*.py"))
+        from rich.table import Table
+        
+        solutions = self.history.latest()
         
         if not solutions:
             console.print("[yellow]No solutions found yet. Complete some exercises first![/yellow]")
@@ -189,28 +546,41 @@ class ExerciseRunner:
         table = Table(title="Available Solutions")
         table.add_column("Exercise", style="cyan")
         table.add_column("Path", style="dim")
+        table.add_column("Versions", justify="right")
+        table.add_column("Last saved", style="dim")
         
-        for solution in sorted(solutions):
-            rel_path = solution.relative_to(self.solutions_dir)
-            table.add_row(solution.stem, str(rel_path))
+        for solution in solutions:
+            table.add_row(
+                solution["name"],
+                solution["exercise"],
+                str(solution["version"]),
+                time.strftime("%Y-%m-%d %H:%M", time.localtime(solution["saved_at"])),
+            )
         
         console.print(table)
     
-    def show_solution(self, exercise_name: str) -> None:
-        """Show a specific solution."""
-        solutions = list(self.solutions_dir.glob(f"**/{exercise_name}.py"))
+    def show_solution(self, exercise_name: str, version: Optional[int] = None) -> None:
+        """Show a saved solution, the latest version unless one is given."""
+        from rich.panel import Panel
         
-        if not solutions:
-            console.print(f"[yellow]No solution found for '{exercise_name}'[/yellow]")
+        found = self.history.get(exercise_name, version)
+        
+        if found is None:
+            if version is not None:
+                console.print(f"[yellow]No version {version} of the solution for '{exercise_name}'[/yellow]")
+            else:
+                console.print(f"[yellow]No solution found for '{exercise_name}'[/yellow]")
             return
         
-        solution = solutions[0]
-        content = solution.read_text()
-        syntax = Syntax(content, "python", theme="monokai", line_numbers=True)
+        solution, content = found
+        total = len([row for row in self.history.versions(exercise_name) if row["exercise"] == solution["exercise"]])
+        syntax = self.render_cache.syntax(console, content.decode("utf-8", errors="replace"))
         
         console.print(Panel(
             f"[bold]Solution for:[/bold] {exercise_name}\n"
-            f"[bold]Path:[/bold] {solution.relative_to(self.solutions_dir)}",
+            f"[bold]Path:[/bold] {solution['exercise']}\n"
+            f"[bold]Version:[/bold] {solution['version']} of {total}, saved "
+            f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(solution['saved_at']))}",
             title="Solution",
             border_style="green"
         ))
@@ -218,29 +588,13 @@ class ExerciseRunner:
     
     def reset_solutions(self) -> None:
         """Reset all solutions by deleting them."""
-        if not self.solutions_dir.exists():
-            console.print("[yellow]No solutions directory found.[/yellow]")
-            return
-        
-        # Delete all Python files in the solutions directory recursively
-        for solution in self.solutions_dir.glob("**/*.py"):
-            solution.unlink()
-        
-        # Remove empty directories
-        for dir_path in sorted(self.solutions_dir.glob("**"), reverse=True):
-            if dir_path.is_dir() and not any(dir_path.iterdir()):
-                dir_path.rmdir()
-        
+        self.history.reset()
         console.print("[yellow]All solutions have been reset.[/yellow]")
     
     def _save_solution(self, exercise: Exercise) -> None:
-        """Save a completed exercise as a solution."""
-        # Determine the solution path
-        solution_path = self.solutions_dir / exercise.relative_path
-        
-        # Create parent directories if they don't exist
-        solution_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Copy the exercise file to the solutions directory
-        shutil.copy2(exercise.path, solution_path)
-        console.print(f"[blue]Solution saved to {solution_path}[/blue]")
+        """Save a completed exercise as a new solution version."""
+        # The content that was graded, not whatever is on disk by now
+        content = exercise.snapshot.content if exercise.snapshot is not None else exercise.path.read_bytes()
+        version = self.history.save(exercise.relative_path, exercise.name, content)
+        if version is not None:
+            console.print(f"[blue]Solution saved as version {version}[/blue]")
@@ -0,0 +1,259 @@
+"""
+Copying the shipped exercises into a learner's exercise directory.
+
+``snakers init`` records, for every file it installs, the hash of the
+upstream content it copied along with the installed file's size and mtime.
+``snakers init --update`` compares against that record: files the learner
+never touched are replaced when upstream changed, new upstream files are
+added, and anything the learner edited is left alone. Unchanged installed
+files are recognised by a stat, without being read.
+
+Files are copied on a thread pool with ``copy_file_range`` (a reflink on
+filesystems that share extents, a kernel-side copy elsewhere), or extracted
+from the exercise pack, into a temporary file that is renamed into place,
+so a running watch session never sees half a file.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional
+
+from rich.console import Console
+
+console = Console()
+
+SYNC_VERSION = 1
+SYNC_FILE = ".snakers_sync.json"
+
+# File types installed from the exercise pack
+SYNC_SUFFIXES = (".py", ".md")
+
+# Outcomes of syncing one file
+NEW = "new"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+MODIFIED = "modified"
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_files(source_dir: Path) -> Iterator[str]:
+    """Yield the relative path of every exercise pack file below a directory."""
+    stack = [source_dir]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir():
+                if entry.name != "__pycache__":
+                    stack.append(Path(entry.path))
+            elif entry.name.endswith(SYNC_SUFFIXES) and entry.is_file():
+                yield Path(entry.path).relative_to(source_dir).as_posix()
+
+
+def copy_file(source: Path, dest: Path) -> None:
+    """Copy a file's content and permission bits, replacing ``dest`` atomically."""
+    with open(source, "rb") as src:
+        copy_stream(src, dest, source)
+
+
+def copy_stream(src: BinaryIO, dest: Path, source: Optional[Path] = None) -> None:
+    """
+    Write a readable binary stream to ``dest``, replacing it atomically.
+
+    Args:
+        src: Stream to copy, positioned at its start
+        dest: File to write
+        source: File the stream reads, if any; the copy is then done with
+            ``copy_file_range`` and the file's permission bits and times are
+            copied too
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp_path, "wb") as dst:
+            if source is None or not _copy_range(src, dst):
+                shutil.copyfileobj(src, dst)
+        if source is not None:
+            shutil.copystat(source, temp_path)
+        os.replace(temp_path, dest)
+    except BaseException:
+        try:
+            temp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _copy_range(src: BinaryIO, dst: BinaryIO) -> bool:
+    """
+    Copy one file to another inside the kernel.
+
+    Returns:
+        False, with both files rewound, if ``copy_file_range`` is not
+        available for them (old kernel, other OS, some cross-filesystem copies)
+    """
+    try:
+        size = os.fstat(src.fileno()).st_size
+        copied = 0
+        while copied < size:
+            count = os.copy_file_range(src.fileno(), dst.fileno(), size - copied)
+            if count == 0:
+                break
+            copied += count
+        return True
+    except (AttributeError, OSError):
+        src.seek(0)
+        dst.seek(0)
+        dst.truncate()
+        return False
+
+
+class DirectorySource:
+    """Exercise files in a directory, as a sync source."""
+
+    def __init__(self, source_dir: Path):
+        self.source_dir = source_dir
+
+    def keys(self) -> List[str]:
+        """Relative paths of the exercise files."""
+        return sorted(source_files(self.source_dir))
+
+    def content_hash(self, key: str) -> str:
+        """SHA-256 of a file."""
+        return file_hash(self.source_dir / key)
+
+    def copy_to(self, key: str, dest: Path) -> None:
+        """Copy a file to ``dest``."""
+        copy_file(self.source_dir / key, dest)
+
+
+class SyncState:
+    """What was installed in an exercise directory, per relative path."""
+
+    def __init__(self, state_file: Path):
+        self.state_file = state_file
+        self.files: Dict[str, dict] = self.load()
+
+    def load(self) -> Dict[str, dict]:
+        """Load the installed file records."""
+        if not self.state_file.exists():
+            return {}
+        try:
+            with open(self.state_file) as f:
+                data = json.load(f)
+            if data.get("version") != SYNC_VERSION:
+                return {}
+            return dict(data.get("files", {}))
+        except (json.JSONDecodeError, IOError, AttributeError, TypeError):
+            console.print("[yellow]Warning: Could not load sync state[/yellow]")
+            return {}
+
+    def save(self) -> None:
+        """Write the installed file records."""
+        data = {"version": SYNC_VERSION, "files": self.files}
+        temp_path = self.state_file.with_name(self.state_file.name + ".tmp")
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(temp_path, self.state_file)
+        except IOError as e:
+            console.print(f"[yellow]Warning: Could not save sync state: {e}[/yellow]")
+
+    def record(self, key: str, content_hash: str, dest: Path) -> None:
+        """Remember that ``dest`` holds upstream content with this hash."""
+        stat = dest.stat()
+        self.files[key] = {"hash": content_hash, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def is_pristine(self, key: str, dest: Path) -> bool:
+        """Whether an installed file still holds the content it was installed with."""
+        installed = self.files.get(key)
+        if installed is None:
+            return False
+        stat = dest.stat()
+        if stat.st_size == installed["size"] and stat.st_mtime_ns == installed["mtime_ns"]:
+            return True
+        # Touched or rewritten: only the content can tell
+        return stat.st_size == installed["size"] and file_hash(dest) == installed["hash"]
+
+
+def sync_exercises(
+    source,
+    dest_dir: Path,
+    files: List[str],
+    update: bool = False,
+    jobs: Optional[int] = None,
+    on_progress: Optional[Callable[[str, str], None]] = None,
+) -> Dict[str, List[str]]:
+    """
+    Install exercise pack files into an exercise directory.
+
+    Args:
+        source: Shipped exercises, a ``DirectorySource`` or an ``ExercisePack``
+        dest_dir: Learner's exercise directory
+        files: Relative paths to install
+        update: Only add new files and refresh ones the learner hasn't
+            modified, instead of overwriting everything
+        jobs: Number of copy threads (default: the executor's default)
+        on_progress: Called with the relative path and outcome of each file
+
+    Returns:
+        Relative paths by outcome (``new``, ``updated``, ``unchanged``, ``modified``)
+    """
+    state = SyncState(dest_dir / SYNC_FILE)
+
+    def sync_one(key: str) -> str:
+        dest = dest_dir / key
+        upstream = source.content_hash(key)
+        if not dest.exists():
+            outcome = NEW
+        elif not update:
+            outcome = UPDATED
+        elif state.is_pristine(key, dest):
+            if state.files[key]["hash"] == upstream:
+                return UNCHANGED
+            outcome = UPDATED
+        elif key not in state.files and file_hash(dest) == upstream:
+            # Installed before syncs were recorded, and still as shipped
+            state.record(key, upstream, dest)
+            return UNCHANGED
+        else:
+            return MODIFIED
+        source.copy_to(key, dest)
+        state.record(key, upstream, dest)
+        return outcome
+
+    results: Dict[str, List[str]] = {NEW: [], UPDATED: [], UNCHANGED: [], MODIFIED: []}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(sync_one, key): key for key in files}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                outcome = future.result()
+            except OSError as e:
+                console.print(f"[red]Error copying {key}: {e}[/red]")
+                continue
+            results[outcome].append(key)
+            if on_progress is not None:
+                on_progress(key, outcome)
+
+    state.save()
+    for keys in results.values():
+        keys.sort()
+    return results
@@ -0,0 +1,387 @@
+"""
+Scheduling of watch-mode checks.
+
+Editors often write a file several times per save (truncate, write, chmod,
+rename), and watchdog reports each write. Change events are therefore
+collected per path and only acted on once a path has been quiet for a short
+debounce window. A single worker thread runs the checks one at a time, and
+a newer save of a file cancels the checks in flight for it so only the
+latest content is graded.
+
+A change may call for several checks: a helper module's change re-checks
+every exercise importing it, in dependency order.
+
+Only the files that matter are watched: the current exercise and the local
+modules it imports, through non-recursive watches on their directories.
+Nothing else under the exercises (``__pycache__`` churn, files written by
+the exercises themselves) wakes the watcher up.
+
+Where the kernel delivers no change notifications (NFS, SMB and the FUSE or
+9p shares behind Docker Desktop bind mounts), the same files are polled
+instead: grouped per directory into one ``os.scandir`` pass, with recently
+edited files polled more often than the rest.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from rich.console import Console
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers.api import BaseObserver, ObservedWatch
+
+from .exercise import Exercise
+
+console = Console()
+
+# Seconds a path must go without change events before it is checked
+WATCH_DEBOUNCE = 0.3
+
+# Polling: seconds between polls of hot (recently edited) and cold files, and
+# how long a file stays hot after it last changed
+POLL_HOT_INTERVAL = 0.25
+POLL_COLD_INTERVAL = 2.0
+POLL_HOT_SECONDS = 60.0
+
+# Filesystems that don't deliver inotify/FSEvents events for remote or host
+# side changes
+NO_EVENT_FILESYSTEMS = {
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "virtiofs", "vboxsf",
+    "fakeowner", "fuse.grpcfuse", "fuse.osxfs", "fuse.sshfs",
+}
+
+
+def needs_polling(path: Path) -> bool:
+    """Whether a path lives on a filesystem that file change events don't work on."""
+    try:
+        with open("/proc/self/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    resolved = str(path.resolve())
+    best, fstype = "", ""
+    for mount_point, mount_type in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        inside = resolved == mount_point or resolved.startswith(mount_point.rstrip("/") + "/")
+        if inside and len(mount_point) >= len(best):
+            best, fstype = mount_point, mount_type
+    return fstype in NO_EVENT_FILESYSTEMS
+
+
+class CheckScheduler:
+    """Debounced queue of changed files checked by one worker thread."""
+
+    def __init__(
+        self,
+        plan_checks: Callable[[Path], List[Exercise]],
+        run_check: Callable[[Exercise], None],
+        debounce: float = WATCH_DEBOUNCE,
+    ):
+        """
+        Args:
+            plan_checks: Exercises to check, in order, after a path changed
+            run_check: Check an exercise and report the result
+            debounce: Seconds a path must be quiet before it is checked
+        """
+        self.plan_checks = plan_checks
+        self.run_check = run_check
+        self.debounce = debounce
+        self._condition = threading.Condition()
+        # Path -> monotonic time its check is due
+        self._pending: Dict[Path, float] = {}
+        # Changed path whose checks are running, and the running check
+        self._source: Optional[Path] = None
+        self._current: Optional[Exercise] = None
+        self._stopped = False
+        self._worker = threading.Thread(target=self._run, name="snakers-check", daemon=True)
+
+    def start(self) -> None:
+        """Start the check worker."""
+        self._worker.start()
+
+    def stop(self) -> None:
+        """Cancel any running check and stop the worker."""
+        with self._condition:
+            self._stopped = True
+            self._pending.clear()
+            if self._current is not None:
+                self._current.cancel()
+            self._condition.notify()
+        self._worker.join(timeout=5)
+
+    def submit(self, path: Path) -> None:
+        """
+        Note a change event for a path.
+
+        The path's checks are (re)scheduled for the end of the debounce
+        window; if they are running right now, they are cancelled.
+        """
+        with self._condition:
+            self._pending[path] = time.monotonic() + self.debounce
+            if self._current is not None and path in (self._source, self._current.path):
+                self._current.cancel()
+            self._condition.notify()
+
+    def _next_due(self) -> Optional[Path]:
+        """Wait for the next path whose debounce window has passed."""
+        with self._condition:
+            while not self._stopped:
+                if self._pending:
+                    path, due = min(self._pending.items(), key=lambda item: item[1])
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        del self._pending[path]
+                        return path
+                    self._condition.wait(remaining)
+                else:
+                    self._condition.wait()
+            return None
+
+    def _run(self) -> None:
+        """Worker loop: check due paths one at a time."""
+        while True:
+            path = self._next_due()
+            if path is None:
+                return
+            try:
+                exercises = self.plan_checks(path)
+            except Exception as e:
+                console.print(f"[red]Error preparing check of {path}: {e}[/red]")
+                continue
+
+            for exercise in exercises:
+                with self._condition:
+                    if self._stopped:
+                        return
+                    if path in self._pending:
+                        # Changed again: the newer save gets a fresh plan
+                        break
+                    self._source = path
+                    self._current = exercise
+                try:
+                    self.run_check(exercise)
+                except Exception as e:
+                    console.print(f"[red]Error checking {exercise.name}: {e}[/red]")
+                finally:
+                    with self._condition:
+                        self._source = None
+                        self._current = None
+                if exercise.cancelled:
+                    break
+
+
+class ScopedWatch:
+    """
+    Watches limited to a set of files, re-targetable while the observer runs.
+
+    Each directory holding a watched file gets one non-recursive watch;
+    events are passed on only for the watched files themselves.
+    """
+
+    def __init__(self, observer: BaseObserver, on_change: Callable[[Path], None]):
+        """
+        Args:
+            observer: Watchdog observer to schedule the watches on
+            on_change: Called with the path of a watched file that changed
+        """
+        self.observer = observer
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._files: frozenset = frozenset()
+        self._watches: Dict[Path, ObservedWatch] = {}
+        self._handler = _ScopedHandler(self)
+
+    def start(self) -> None:
+        """Start delivering change events."""
+        self.observer.start()
+
+    def stop(self) -> None:
+        """Stop delivering change events."""
+        self.observer.stop()
+
+    def join(self) -> None:
+        """Block until stopped."""
+        self.observer.join()
+
+    @property
+    def files(self) -> frozenset:
+        """The files currently watched."""
+        return self._files
+
+    def watch(self, files: Iterable[Path]) -> None:
+        """Watch exactly these files, moving directory watches as needed."""
+        files = frozenset(files)
+        with self._lock:
+            if files == self._files:
+                return
+            directories = {path.parent for path in files}
+            for directory in set(self._watches) - directories:
+                self.observer.unschedule(self._watches.pop(directory))
+            for directory in directories - set(self._watches):
+                self._watches[directory] = self.observer.schedule(
+                    self._handler, str(directory), recursive=False
+                )
+            self._files = files
+
+    def _dispatch(self, path: str) -> None:
+        """Pass a changed path on if it is one of the watched files."""
+        file_path = Path(path)
+        if file_path in self._files:
+            self.on_change(file_path)
+
+
+class _ScopedHandler(FileSystemEventHandler):
+    """Watchdog handler feeding a ScopedWatch."""
+
+    def __init__(self, scope: ScopedWatch):
+        self.scope = scope
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.scope._dispatch(str(event.src_path))
+
+    # Editors that save by writing a new file and renaming it over the old
+    # one produce these instead of a modification
+    on_created = on_modified
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.scope._dispatch(str(event.dest_path))
+
+
+# (mtime_ns, size, inode): a rename-over save changes the inode even when
+# mtime and size happen to match
+Signature = Tuple[int, int, int]
+
+
+class PollingWatch:
+    """
+    Stat-polling replacement for ScopedWatch where change events don't work.
+
+    Watched files are stat'ed with one ``os.scandir`` pass per directory.
+    Files edited in the last minute, and the first file given to ``watch``
+    (the current exercise), are polled every ``hot_interval`` seconds; the
+    rest every ``cold_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[Path], None],
+        hot_interval: float = POLL_HOT_INTERVAL,
+        cold_interval: float = POLL_COLD_INTERVAL,
+    ):
+        """
+        Args:
+            on_change: Called with the path of a watched file that changed
+            hot_interval: Seconds between polls of hot files
+            cold_interval: Seconds between polls of the other files
+        """
+        self.on_change = on_change
+        self.hot_interval = hot_interval
+        self.cold_interval = cold_interval
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._files: frozenset = frozenset()
+        self._primary: Optional[Path] = None
+        self._signatures: Dict[Path, Optional[Signature]] = {}
+        # Path -> monotonic time it last changed
+        self._changed_at: Dict[Path, float] = {}
+        self._thread = threading.Thread(target=self._run, name="snakers-poll", daemon=True)
+
+    @property
+    def files(self) -> frozenset:
+        """The files currently watched."""
+        return self._files
+
+    def watch(self, files: Iterable[Path]) -> None:
+        """Watch exactly these files (the first one is always hot)."""
+        files = list(files)
+        with self._lock:
+            self._primary = files[0] if files else None
+            added = [path for path in files if path not in self._signatures]
+            self._files = frozenset(files)
+            for path in list(self._signatures):
+                if path not in self._files:
+                    del self._signatures[path]
+                    self._changed_at.pop(path, None)
+        # Baseline for new files, so they aren't reported as changed
+        baseline = self._stat(added)
+        with self._lock:
+            for path, signature in baseline.items():
+                if path in self._files:
+                    self._signatures.setdefault(path, signature)
+
+    def start(self) -> None:
+        """Start polling."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling."""
+        self._stopped.set()
+
+    def join(self) -> None:
+        """Block until stopped."""
+        while self._thread.is_alive():
+            self._thread.join(timeout=0.5)
+
+    def _run(self) -> None:
+        """Poll loop: hot files every tick, everything every few ticks."""
+        next_cold = 0.0
+        while not self._stopped.wait(self.hot_interval):
+            now = time.monotonic()
+            with self._lock:
+                if now >= next_cold:
+                    due = list(self._files)
+                    next_cold = now + self.cold_interval
+                else:
+                    due = [path for path in self._files if self._is_hot(path, now)]
+            if not due:
+                continue
+
+            changed = []
+            current = self._stat(due)
+            with self._lock:
+                for path, signature in current.items():
+                    if path not in self._files:
+                        continue
+                    previous = self._signatures.get(path)
+                    self._signatures[path] = signature
+                    # A missing file is mid-save or deleted; report it when it reappears
+                    if signature is not None and signature != previous:
+                        self._changed_at[path] = now
+                        changed.append(path)
+            for path in changed:
+                self.on_change(path)
+
+    def _is_hot(self, path: Path, now: float) -> bool:
+        """Whether a file is polled on every tick."""
+        if path == self._primary:
+            return True
+        changed_at = self._changed_at.get(path)
+        return changed_at is not None and now - changed_at < POLL_HOT_SECONDS
+
+    @staticmethod
+    def _stat(files: Iterable[Path]) -> Dict[Path, Optional[Signature]]:
+        """Signatures of files, one directory scan per directory (None: missing)."""
+        by_directory: Dict[Path, set] = {}
+        for path in files:
+            by_directory.setdefault(path.parent, set()).add(path.name)
+
+        signatures: Dict[Path, Optional[Signature]] = {}
+        for directory, names in by_directory.items():
+            for name in names:
+                signatures[directory / name] = None
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name in names:
+                            try:
+                                stat = entry.stat()
+                            except OSError:
+                                continue
+                            signatures[directory / entry.name] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            except OSError:
+                continue
+        return signatures
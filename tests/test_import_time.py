@@ -0,0 +1,106 @@
+"""
+Startup import regression tests.
+
+``--version``, ``help`` and the commands that only read progress must not
+pay for syntax highlighting, file watching or asyncio, which only the
+commands that use them import (``run`` highlights the exercise source).
+Each command also has a budget for the total time spent importing, as
+reported by ``python -X importtime``; the budgets leave a few times the
+measured cost as headroom for slow machines. Commands that need exercises
+run against a one-exercise directory and a progress database in a
+temporary home.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules only the commands that render, watch or run checks concurrently need
+HEAVY_MODULES = ["rich.syntax", "pygments", "watchdog", "asyncio"]
+
+# Commands that must not import any of HEAVY_MODULES
+LIGHT_COMMANDS = ["--version", "help", "list", "solutions list", "report"]
+
+# Total import time allowed per command, in milliseconds
+IMPORT_BUDGETS_MS = {
+    "--version": 150,
+    "help": 300,
+    "list": 450,
+    "run": 450,
+    "solutions list": 450,
+    "report": 450,
+}
+
+# Runs the CLI on the exercises directory given as the first argument
+RUN_CLI = (
+    "import sys; from pathlib import Path; from snakers.cli import main; "
+    "main(exercises_dir=Path(sys.argv.pop(1)))"
+)
+
+EXERCISE = '''"""
+Exercise 1: Hello
+
+Print a greeting.
+"""
+
+print("hello")
+'''
+
+
+def import_times(command, home):
+    """
+    Run ``snakers <command>`` under ``python -X importtime``.
+
+    ``home`` is used as the home directory, and holds the exercises
+    directory and the progress database.
+
+    Returns:
+        Self import time in microseconds of every module imported, by name
+    """
+    exercises_dir = home / "exercises"
+    if not exercises_dir.exists():
+        (exercises_dir / "01_intro").mkdir(parents=True)
+        (exercises_dir / "01_intro" / "01_hello.py").write_text(EXERCISE)
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(REPO_ROOT),
+        HOME=str(home),
+        SNAKERS_PROGRESS_DB=str(home / "progress.db"),
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUN_CLI, str(exercises_dir), *command.split()],
+        cwd=home,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+@pytest.mark.parametrize("command", LIGHT_COMMANDS)
+def test_command_skips_heavy_imports(command, tmp_path):
+    modules = import_times(command, tmp_path)
+    assert "snakers.cli" in modules
+    for heavy in HEAVY_MODULES:
+        imported = [name for name in modules if name == heavy or name.startswith(heavy + ".")]
+        assert not imported, f"'snakers {command}' imported {', '.join(imported)}"
+
+
+@pytest.mark.parametrize("command", sorted(IMPORT_BUDGETS_MS))
+def test_command_import_budget(command, tmp_path):
+    # Best of a few runs, so a busy machine doesn't fail the test
+    total_ms = min(sum(import_times(command, tmp_path).values()) for _ in range(3)) / 1000
+    budget_ms = IMPORT_BUDGETS_MS[command]
+    assert total_ms <= budget_ms, f"'snakers {command}' spent {total_ms:.1f} ms importing (budget {budget_ms} ms)"
@@ -0,0 +1,50 @@
+"""
+Staleness check of exercise packs against the loose exercise files.
+"""
+
+import os
+
+from snakers.pack import ExercisePack, build_pack
+
+
+def make_exercises(source_dir):
+    (source_dir / "01_intro").mkdir(parents=True)
+    (source_dir / "01_intro" / "01_hello.py").write_text('"""\nHello\n"""\n\nprint("hello")\n')
+    (source_dir / "01_intro" / "README.md").write_text("# Intro\n")
+
+
+def edit_after_build(path, pack_file):
+    path.write_text(path.read_text() + "# edited\n")
+    built = os.stat(pack_file).st_mtime_ns
+    os.utime(path, ns=(built + 10 ** 9, built + 10 ** 9))
+
+
+def test_checkout_pack_matches_until_edited(tmp_path):
+    source_dir, pack_file = tmp_path / "exercises", tmp_path / "exercises.zip"
+    make_exercises(source_dir)
+    build_pack(source_dir, pack_file)
+    pack = ExercisePack(pack_file)
+    assert not pack.release
+    assert pack.matches(source_dir)
+
+    edit_after_build(source_dir / "01_intro" / "01_hello.py", pack_file)
+    assert not pack.matches(source_dir)
+
+
+def test_checkout_pack_notices_added_files(tmp_path):
+    source_dir, pack_file = tmp_path / "exercises", tmp_path / "exercises.zip"
+    make_exercises(source_dir)
+    build_pack(source_dir, pack_file)
+    (source_dir / "01_intro" / "02_more.py").write_text("print('more')\n")
+    assert not ExercisePack(pack_file).matches(source_dir)
+
+
+def test_release_pack_skips_the_scan(tmp_path):
+    source_dir, pack_file = tmp_path / "exercises", tmp_path / "exercises.zip"
+    make_exercises(source_dir)
+    build_pack(source_dir, pack_file, release=True)
+    pack = ExercisePack(pack_file)
+    assert pack.release
+
+    edit_after_build(source_dir / "01_intro" / "01_hello.py", pack_file)
+    assert pack.matches(source_dir)
@@ -0,0 +1,41 @@
+"""
+Cohort report queries of the progress store.
+"""
+
+from snakers.progress import ProgressStore
+
+
+def make_cohort(db_file):
+    """Two learners stuck on a/02_fail.py, one of whom completed a/01_ok.py."""
+    alice = ProgressStore(db_file, "alice")
+    bob = ProgressStore(db_file, "bob")
+    alice.record_attempt("a/01_ok.py", True)
+    for store in (alice, bob, bob):
+        store.record_attempt("a/02_fail.py", False, "boom")
+    # Shares the a/ prefix without being under the a directory
+    bob.record_attempt("ab/01_other.py", False)
+    return alice
+
+
+def test_summary_by_directory(tmp_path):
+    store = make_cohort(tmp_path / "progress.db")
+    rows = {row["exercise"]: row for row in store.cohort_summary("a")}
+    assert sorted(rows) == ["a/01_ok.py", "a/02_fail.py"]
+    assert rows["a/02_fail.py"]["stuck"] == 2
+    assert rows["a/02_fail.py"]["attempts"] == 3
+
+
+def test_summary_by_file(tmp_path):
+    store = make_cohort(tmp_path / "progress.db")
+    rows = store.cohort_summary("a/02_fail.py")
+    assert [row["exercise"] for row in rows] == ["a/02_fail.py"]
+    assert rows[0]["done"] == 0
+    assert rows[0]["stuck"] == 2
+
+
+def test_stuck_by_file(tmp_path):
+    store = make_cohort(tmp_path / "progress.db")
+    stuck = store.stuck("a/02_fail.py")
+    assert [row["learner"] for row in stuck] == ["bob", "alice"]
+    assert stuck[0]["attempts"] == 2
+    assert store.stuck("a/01_ok.py") == []